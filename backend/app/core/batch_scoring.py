@@ -0,0 +1,370 @@
+import os
+import re
+import math
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from typing import Dict, List, Any, Union, Mapping, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+
+from app.core.enhanced_scoring import OptimizedScoring, JobProfile, LOCATION_SCORES, get_job_profile, skill_text
+from app.core.keyword_matcher import KeywordMatcher
+
+DIMENSIONS = ("education", "trajectory", "company", "experience", "location", "tenure")
+WEIGHTS = (0.20, 0.20, 0.15, 0.25, 0.10, 0.10)
+
+load_dotenv()
+
+# Featurized candidate sets kept for re-scoring, bounded by their total number of candidates
+BATCH_CACHE_MAX_CANDIDATES = int(os.getenv('BATCH_CACHE_MAX_CANDIDATES', 200000))
+
+_LOCATION_SCORES = np.array(LOCATION_SCORES + [7.0])  # last slot: no location hit
+
+# Required skills only contain these characters, so every skill occurrence in a candidate's
+# text lies inside one maximal run of them. Matching skills against the distinct runs of the
+# whole pool (its vocabulary) is therefore equivalent to matching against each candidate's text.
+_TOKEN_PATTERN = re.compile(r'[a-z0-9\+\#\.]+')
+
+
+class CandidateBatch:
+    """Columnar, job-independent feature arrays for a list of candidates"""
+
+    def __init__(self, candidates: List[Dict[str, Any]], scorer: OptimizedScoring = None):
+        scorer = scorer or OptimizedScoring()
+        self.candidates = candidates
+        size = len(candidates)
+        flags = {name: np.zeros(size, dtype=bool) for name in (
+            "edu_elite", "edu_strong", "text_elite", "text_strong", "text_edu_word",
+            "senior", "mid", "junior", "top_company", "industry", "tech_role", "job_hopping"
+        )}
+        location_rank = np.full(size, len(LOCATION_SCORES), dtype=np.int16)
+        duration = np.full(size, -1, dtype=np.int32)
+        year = np.full(size, -1, dtype=np.int32)
+
+        for i, candidate in enumerate(candidates):
+            f = scorer.extract_features(candidate)
+            headline, title, education = f["headline"], f["title"], f["education"]
+            flags["edu_elite"][i] = "elite_school" in education
+            flags["edu_strong"][i] = "strong_school" in education
+            flags["text_elite"][i] = "elite_school" in headline or "elite_school" in title
+            flags["text_strong"][i] = "strong_school" in headline or "strong_school" in title
+            flags["text_edu_word"][i] = "education_word" in headline or "education_word" in title
+            flags["senior"][i] = "senior_role" in headline
+            flags["mid"][i] = "mid_role" in headline
+            flags["junior"][i] = "junior_role" in headline
+            flags["top_company"][i] = "top_company" in headline or "top_company" in f["companies"]
+            flags["industry"][i] = "industry" in headline
+            flags["tech_role"][i] = "tech_role" in headline
+            flags["job_hopping"][i] = "job_hopping" in headline
+            ranks = [x["location"] for x in (headline, f["location"]) if "location" in x]
+            if ranks:
+                location_rank[i] = min(ranks)
+
+            headline_text = candidate.get("headline", "").lower()
+            duration_match = scorer.duration_pattern.search(headline_text)
+            if duration_match:
+                duration[i] = int(duration_match.group(1))
+            year_match = scorer.year_pattern.search(headline_text)
+            if year_match:
+                year[i] = int(year_match.group())
+
+        # Candidate x vocabulary incidence in CSR form (indptr/indices)
+        vocabulary: Dict[str, int] = {}
+        indices, indptr = [], [0]
+        for candidate in candidates:
+            tokens = {vocabulary.setdefault(t, len(vocabulary)) for t in _TOKEN_PATTERN.findall(skill_text(candidate))}
+            indices.extend(tokens)
+            indptr.append(len(indices))
+        self.vocabulary = list(vocabulary)
+        self.token_indices = np.array(indices, dtype=np.int64)
+        self.token_indptr = np.array(indptr, dtype=np.int64)
+        self.flags = flags
+        self.location_rank = location_rank
+        self.duration = duration
+        self.year = year
+        self._independent = None
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def job_independent_scores(self) -> np.ndarray:
+        """(M, 5) array of education, trajectory, company, location and tenure scores, computed once per batch"""
+        if self._independent is None:
+            self._independent = self._compute_job_independent_scores()
+        return self._independent
+
+    def _compute_job_independent_scores(self) -> np.ndarray:
+        f = self.flags
+        education = np.select(
+            [f["edu_elite"], f["edu_strong"], f["text_elite"], f["text_strong"], f["text_edu_word"]],
+            [9.5, 8.0, 9.0, 7.5, 6.0], default=4.0
+        )
+        trajectory = np.select([f["senior"], f["mid"], f["junior"]], [8.5, 7.0, 4.0], default=6.0)
+        company = np.select([f["top_company"], f["industry"], f["tech_role"]], [9.5, 7.5, 6.0], default=5.0)
+        location = _LOCATION_SCORES[self.location_rank]
+        tenure = np.select(
+            [self.duration >= 2, self.duration >= 1, self.year >= 2021, f["job_hopping"]],
+            [9.0, 7.0, 8.0, 4.0], default=7.0
+        )
+        return np.stack([education, trajectory, company, location, tenure], axis=1)
+
+    def skill_match_counts(self, job_profile: JobProfile) -> np.ndarray:
+        """Distinct required skills per candidate, via bitmasks over the pool vocabulary"""
+        return self.skill_match_matrix([job_profile])[0]
+
+    def skill_match_matrix(self, job_profiles: Sequence[JobProfile]) -> np.ndarray:
+        """(N, M) distinct required skills of each job per candidate.
+
+        The vocabulary is matched once against the union of every job's skills, and each
+        candidate's tokens are OR-ed into one mask; a job's count is then the popcount of
+        that mask restricted to the job's own skill bits.
+        """
+        size = len(self.candidates)
+        counts = np.zeros((len(job_profiles), size), dtype=np.int64)
+        skills = sorted(set().union(*(profile.required_skills for profile in job_profiles)))
+        if not skills or not len(self.token_indices):
+            return counts
+        if len(job_profiles) == 1:
+            matcher = job_profiles[0].skill_matcher
+        else:
+            matcher = KeywordMatcher((skill, "skill", 0) for skill in skills)
+        bit_of = {skill: i for i, skill in enumerate(skills)}
+        words = (len(skills) + 63) // 64
+
+        def mask_of(found) -> np.ndarray:
+            mask = np.zeros(words, dtype=np.uint64)
+            for skill in found:
+                bit = bit_of[skill]
+                mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+            return mask
+
+        token_masks = np.zeros((len(self.vocabulary) + 1, words), dtype=np.uint64)  # last row: padding
+        for token_id, token in enumerate(self.vocabulary):
+            found = matcher.keywords_in(token)
+            if found:
+                token_masks[token_id] = mask_of(found)
+        job_masks = np.array([mask_of(profile.required_skills) for profile in job_profiles])
+
+        # OR the masks of each candidate's tokens together, then count each job's bits
+        padded = np.append(self.token_indices, len(self.vocabulary))
+        starts = self.token_indptr[:-1]
+        empty = starts == self.token_indptr[1:]
+        for word in range(words):
+            combined = np.bitwise_or.reduceat(token_masks[padded, word], starts)
+            combined[empty] = 0
+            for j in np.flatnonzero(job_masks[:, word]):
+                counts[j] += np.bitwise_count(combined & job_masks[j, word])
+        return counts
+
+    def experience_scores(self, job_profile: JobProfile) -> np.ndarray:
+        return experience_from_matches(self.skill_match_counts(job_profile))
+
+
+def experience_from_matches(matches: np.ndarray) -> np.ndarray:
+    """get_experience_score's thresholds applied to an array of skill match counts"""
+    return np.select([matches >= 4, matches >= 3, matches >= 2, matches >= 1], [9.5, 8.5, 7.0, 6.0], default=5.0)
+
+
+def candidate_fingerprint(candidates: List[Dict[str, Any]]) -> str:
+    """Digest of a candidate list's content (order included)"""
+    raw = json.dumps(candidates, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class BatchCache:
+    """LRU of CandidateBatch objects keyed by candidate_fingerprint().
+
+    Re-scoring the same candidates against an edited job description or new weights then
+    skips featurization; only the experience dimension and the weighted sum are recomputed.
+    """
+
+    def __init__(self, max_candidates: int = None):
+        self.max_candidates = BATCH_CACHE_MAX_CANDIDATES if max_candidates is None else max_candidates
+        self.hits = 0
+        self.misses = 0
+        self._batches: "OrderedDict[str, CandidateBatch]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, candidates: List[Dict[str, Any]]) -> CandidateBatch:
+        if not 0 < len(candidates) <= self.max_candidates:
+            return CandidateBatch(candidates)
+        key = candidate_fingerprint(candidates)
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is not None:
+                self._batches.move_to_end(key)
+                self.hits += 1
+                return batch
+            self.misses += 1
+        batch = CandidateBatch(candidates)
+        with self._lock:
+            if key not in self._batches:
+                self._batches[key] = batch
+                self._size += len(batch)
+            while self._size > self.max_candidates:
+                _, evicted = self._batches.popitem(last=False)
+                self._size -= len(evicted)
+        return batch
+
+    def clear(self):
+        with self._lock:
+            self._batches.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"batches": len(self._batches), "candidates": self._size, "hits": self.hits, "misses": self.misses}
+
+
+_batch_cache = None
+_batch_cache_lock = threading.Lock()
+
+
+def get_batch_cache() -> BatchCache:
+    global _batch_cache
+    if _batch_cache is None:
+        with _batch_cache_lock:
+            if _batch_cache is None:
+                _batch_cache = BatchCache()
+    return _batch_cache
+
+
+def resolve_weights(weights: Optional[Mapping[str, float]] = None) -> Tuple[float, ...]:
+    """Dimension weights in DIMENSIONS order: the defaults with the given ones replaced.
+
+    Weights are relative; they are rescaled to sum to 1 so totals stay on the 0-10 scale.
+    Raises ValueError for unknown dimensions, negative values or an all-zero set.
+    """
+    if not weights:
+        return WEIGHTS
+    unknown = set(weights) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown scoring dimensions: {', '.join(sorted(unknown))}")
+    merged = [float(weights.get(dim, default)) for dim, default in zip(DIMENSIONS, WEIGHTS)]
+    if any(not math.isfinite(w) or w < 0 for w in merged):
+        raise ValueError("Scoring weights must be non-negative numbers")
+    total = sum(merged)
+    if total <= 0:
+        raise ValueError("At least one scoring weight must be positive")
+    return tuple(w / total for w in merged)
+
+
+def score_batch(batch: CandidateBatch, job: Union[str, JobProfile]) -> np.ndarray:
+    """(M, 6) breakdown array in DIMENSIONS order"""
+    job_profile = job if isinstance(job, JobProfile) else get_job_profile(job)
+    independent = batch.job_independent_scores()
+    experience = batch.experience_scores(job_profile)
+    return np.column_stack([independent[:, :3], experience, independent[:, 3:]])
+
+
+def weighted_totals(breakdown: np.ndarray, weights: Tuple[float, ...] = WEIGHTS) -> np.ndarray:
+    """Weighted sum accumulated in the same order as score_candidate_basic, so totals match it bit for bit"""
+    total = breakdown[:, 0] * weights[0]
+    for column in range(1, len(DIMENSIONS)):
+        total = total + breakdown[:, column] * weights[column]
+    return total
+
+
+def round_scores(totals: np.ndarray) -> np.ndarray:
+    """Vectorized round(x, 1) that agrees with Python's round() on values sitting at a .x5 boundary"""
+    rounded = np.round(totals, 1)
+    scaled = totals * 10
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        rounded.flat[i] = round(float(totals.flat[i]), 1)
+    return rounded
+
+
+def top_k_indices(scores: np.ndarray, top_k: int = None) -> np.ndarray:
+    """Indices of the top_k scores in stable descending order (ties keep input order).
+
+    With top_k set, the candidates are first narrowed with an O(M) partition so only
+    k entries are sorted.
+    """
+    size = len(scores)
+    if top_k is None or top_k >= size:
+        return np.argsort(-scores, kind="stable")
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    threshold = np.partition(scores, size - top_k)[size - top_k]
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:top_k - len(above)]
+    selected = np.concatenate([above, ties])
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+def score_candidates_batch(candidates: List[Dict[str, Any]], job_description: str, top_k: int = None,
+                           batch: CandidateBatch = None,
+                           weights: Optional[Mapping[str, float]] = None) -> List[Dict[str, Any]]:
+    """Vectorized basic scoring; only the top_k results are turned back into response dicts.
+
+    Without an explicit batch, the candidates' features come from the shared BatchCache.
+    weights overrides some or all of the default dimension weights (see resolve_weights).
+    """
+    batch = batch or get_batch_cache().get(candidates)
+    order, scores, breakdown = rank_batch(batch, job_description, top_k, weights)
+    return [result_entry(batch.candidates[i], scores[i], breakdown[i]) for i in order.tolist()]
+
+
+def rank_batch(batch: CandidateBatch, job_description: str, top_k: int = None,
+               weights: Optional[Mapping[str, float]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ranked indices, rounded scores, breakdown) for a batch; indices are best first, ties in input order"""
+    resolved = resolve_weights(weights)
+    if not len(batch):
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, np.empty((0, len(DIMENSIONS)))
+    breakdown = score_batch(batch, job_description)
+    scores = round_scores(weighted_totals(breakdown, resolved))
+    return top_k_indices(scores, top_k), scores, breakdown
+
+
+def result_entry(candidate: Dict[str, Any], score: float, breakdown: np.ndarray) -> Dict[str, Any]:
+    """One scored candidate in the response shape of the scoring endpoints"""
+    return {
+        "name": candidate["name"],
+        "linkedin_url": candidate["linkedin_url"],
+        "headline": candidate.get("headline", ""),
+        "score": float(score),
+        "breakdown": {dim: round(float(v), 1) for dim, v in zip(DIMENSIONS, breakdown)},
+        "reasoning": {}
+    }
+
+
+def score_jobs_batch(candidates: List[Dict[str, Any]], job_descriptions: Sequence[str], top_k: int = None,
+                     batch: CandidateBatch = None,
+                     weights: Optional[Mapping[str, float]] = None) -> List[List[Dict[str, Any]]]:
+    """Rank the same candidates for several jobs at once; one result list per job, in input order.
+
+    Candidate features and the job-independent part of the weighted sum are computed once.
+    Per job only the experience row of the (N, M) score matrix differs, and every job's
+    skills are matched against the pool vocabulary in a single pass. Scores match
+    score_candidates_batch run once per job.
+    """
+    resolved = resolve_weights(weights)
+    batch = batch or get_batch_cache().get(candidates)
+    if not job_descriptions:
+        return []
+    if not len(batch):
+        return [[] for _ in job_descriptions]
+    profiles = [get_job_profile(description) for description in job_descriptions]
+    independent = batch.job_independent_scores()
+    experience = experience_from_matches(batch.skill_match_matrix(profiles))
+
+    # Same accumulation order as weighted_totals, so totals agree with it bit for bit
+    prefix = independent[:, 0] * resolved[0] + independent[:, 1] * resolved[1] + independent[:, 2] * resolved[2]
+    totals = prefix[None, :] + experience * resolved[3]
+    totals = totals + (independent[:, 3] * resolved[4])[None, :]
+    totals = totals + (independent[:, 4] * resolved[5])[None, :]
+    scores = round_scores(totals)
+
+    rankings = []
+    for j in range(len(profiles)):
+        entries = []
+        for i in top_k_indices(scores[j], top_k).tolist():
+            breakdown = (*independent[i, :3], experience[j, i], *independent[i, 3:])
+            entries.append(result_entry(batch.candidates[i], scores[j, i], breakdown))
+        rankings.append(entries)
+    return rankings
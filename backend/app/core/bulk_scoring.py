@@ -0,0 +1,185 @@
+import os
+import csv
+import sys
+import gzip
+import json
+import heapq
+import tempfile
+import itertools
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.core.batch_scoring import DIMENSIONS, CandidateBatch, rank_batch, result_entry
+
+# Fields holding lists; in CSV files they are a JSON array or a ";"-separated string
+LIST_FIELDS = ("education", "companies", "skills")
+CSV_COLUMNS = ["rank", "row", "name", "linkedin_url", "headline", "score"] + list(DIMENSIONS)
+
+
+def file_format(path: str, fmt: str = None) -> str:
+    """"jsonl" or "csv", from fmt or the file extension (a trailing .gz is ignored)"""
+    if fmt:
+        return fmt.lower()
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.lower().endswith(".csv") else "jsonl"
+
+
+def _open_text(path: str, mode: str):
+    if path == "-":
+        return nullcontext(sys.stdin if "r" in mode else sys.stdout)
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def _normalize(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Candidate dict in the shape the scorer expects, whatever the export left out"""
+    candidate = {k: v for k, v in record.items() if k is not None}
+    for field in ("name", "linkedin_url", "headline", "title", "location"):
+        candidate[field] = str(candidate.get(field) or "")
+    for field in LIST_FIELDS:
+        value = candidate.get(field) or []
+        if isinstance(value, str):
+            value = value.strip()
+            if value.startswith("["):
+                value = json.loads(value)
+            else:
+                value = [part.strip() for part in value.split(";") if part.strip()]
+        candidate[field] = [str(v) for v in value]
+    try:
+        candidate["experience_years"] = int(float(candidate.get("experience_years") or 0))
+    except (TypeError, ValueError):
+        candidate["experience_years"] = 0
+    return candidate
+
+
+def read_candidates(path: str, fmt: str = None) -> Iterator[Dict[str, Any]]:
+    """Stream candidates from a JSONL or CSV file ("-" for stdin), one row at a time.
+
+    Malformed rows are reported on stderr and skipped.
+    """
+    fmt = file_format(path, fmt)
+    with _open_text(path, "r") as f:
+        rows = csv.DictReader(f) if fmt == "csv" else f
+        for line_number, row in enumerate(rows, start=2 if fmt == "csv" else 1):
+            try:
+                if fmt != "csv":
+                    if not row.strip():
+                        continue
+                    row = json.loads(row)
+                yield _normalize(row)
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"Skipping malformed row {line_number} of {path}: {e}", file=sys.stderr)
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_chunk(job_description: str, first_row: int, candidates: List[Dict[str, Any]],
+                top_k: int = None) -> List[Dict[str, Any]]:
+    """Basic scores of one chunk, best first, each tagged with its input row number.
+
+    Runs in worker processes, so it only takes and returns plain data.
+    """
+    order, scores, breakdown = rank_batch(CandidateBatch(candidates), job_description, top_k)
+    return [dict(result_entry(candidates[i], scores[i], breakdown[i]), row=first_row + i) for i in order.tolist()]
+
+
+def iter_scored_chunks(candidates: Iterable[Dict[str, Any]], job_description: str, chunk_size: int = 50000,
+                       workers: int = 1, top_k: int = None) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Score candidates chunk by chunk, yielding (chunk length, ranked results) in input order.
+
+    With workers > 1 the chunks are scored on a process pool. At most two chunks per
+    worker are read ahead, so memory stays bounded however long the input is.
+    """
+    chunks = chunked(candidates, chunk_size)
+    if workers <= 1:
+        first_row = 0
+        for chunk in chunks:
+            yield len(chunk), score_chunk(job_description, first_row, chunk, top_k)
+            first_row += len(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        first_row = 0
+        for chunk in chunks:
+            in_flight.append((len(chunk), executor.submit(score_chunk, job_description, first_row, chunk, top_k)))
+            first_row += len(chunk)
+            if len(in_flight) >= workers * 2:
+                size, future = in_flight.popleft()
+                yield size, future.result()
+        while in_flight:
+            size, future = in_flight.popleft()
+            yield size, future.result()
+
+
+def _rank_key(entry: Dict[str, Any]):
+    return -entry["score"], entry["row"]
+
+
+def rank_candidates(candidates: Iterable[Dict[str, Any]], job_description: str, chunk_size: int = 50000,
+                    workers: int = 1, top_k: int = None, tmp_dir: str = None,
+                    on_chunk=None) -> Iterator[Dict[str, Any]]:
+    """Every candidate's basic score, best first (ties in input order), with flat memory use.
+
+    With top_k only a running shortlist of k entries is kept. Otherwise each scored chunk
+    is written to a sorted run file under tmp_dir and the runs are merged lazily (an
+    external merge sort), so at most one chunk plus one row per run is held in memory.
+    on_chunk(scored_count) is called after each chunk.
+    """
+    scored_count = 0
+    if top_k is not None:
+        shortlist: List[Dict[str, Any]] = []
+        for size, scored in iter_scored_chunks(candidates, job_description, chunk_size, workers, top_k):
+            shortlist = list(itertools.islice(heapq.merge(shortlist, scored, key=_rank_key), top_k))
+            scored_count += size
+            if on_chunk:
+                on_chunk(scored_count)
+        yield from shortlist
+        return
+
+    with tempfile.TemporaryDirectory(prefix="bulk-score-", dir=tmp_dir) as run_dir:
+        run_paths = []
+        for size, scored in iter_scored_chunks(candidates, job_description, chunk_size, workers):
+            path = os.path.join(run_dir, f"run-{len(run_paths):06d}.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for entry in scored:
+                    f.write(json.dumps(entry) + "\n")
+            run_paths.append(path)
+            scored_count += size
+            if on_chunk:
+                on_chunk(scored_count)
+
+        run_files = [open(path, encoding="utf-8") for path in run_paths]
+        try:
+            runs = [(json.loads(line) for line in f) for f in run_files]
+            yield from heapq.merge(*runs, key=_rank_key)
+        finally:
+            for f in run_files:
+                f.close()
+
+
+def write_ranked(entries: Iterable[Dict[str, Any]], path: str, fmt: str = None) -> int:
+    """Write ranked entries as JSONL or CSV (one column per dimension) as they arrive; returns the row count"""
+    fmt = file_format(path, fmt)
+    count = 0
+    with _open_text(path, "w") as f:
+        writer = None
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+        for count, entry in enumerate(entries, start=1):
+            if writer:
+                writer.writerow(dict(entry, rank=count, **entry["breakdown"]))
+            else:
+                f.write(json.dumps(dict(rank=count, **entry)) + "\n")
+    return count
@@ -0,0 +1,133 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Optional
+import httpx
+import httplib2
+from groq import Groq
+from googleapiclient.discovery import build
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Keep-alive pool for the Groq HTTP client (httpx.Client is safe to share across threads)
+GROQ_MAX_CONNECTIONS = int(os.getenv('GROQ_MAX_CONNECTIONS', 32))
+GROQ_MAX_KEEPALIVE = int(os.getenv('GROQ_MAX_KEEPALIVE', 16))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv('GROQ_KEEPALIVE_EXPIRY_SECONDS', 60))
+GROQ_TIMEOUT = float(os.getenv('GROQ_TIMEOUT_SECONDS', 30))
+
+# httplib2 connections for Custom Search; each is lent to one thread at a time
+CSE_POOL_SIZE = int(os.getenv('CSE_POOL_SIZE', 8))
+CSE_TIMEOUT = float(os.getenv('CSE_TIMEOUT_SECONDS', 15))
+
+
+class ClientRegistry:
+    """Process-wide Groq and Custom Search clients with pooled keep-alive connections.
+
+    Clients are created on first use and reused by every request, so TLS sessions are
+    set up once per connection rather than once per call. close() releases them all.
+    """
+
+    def __init__(self, groq_max_connections: int = None, groq_max_keepalive: int = None, cse_pool_size: int = None):
+        self.groq_max_connections = groq_max_connections or GROQ_MAX_CONNECTIONS
+        self.groq_max_keepalive = groq_max_keepalive or GROQ_MAX_KEEPALIVE
+        self.cse_pool_size = max(1, cse_pool_size or CSE_POOL_SIZE)
+        self._lock = threading.Lock()
+        self._groq = None
+        self._groq_http = None
+        self._cse_service = None
+        self._cse_pool = queue.LifoQueue()  # most recently used connection first, it is the likeliest still open
+        self._cse_slots = threading.BoundedSemaphore(self.cse_pool_size)
+
+    def groq(self) -> Optional[Groq]:
+        """Shared Groq client, or None when GROQ_API_KEY is not set"""
+        if self._groq is None:
+            api_key = os.getenv('GROQ_API_KEY')
+            if not api_key:
+                return None
+            with self._lock:
+                if self._groq is None:
+                    self._groq_http = httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=self.groq_max_connections,
+                            max_keepalive_connections=self.groq_max_keepalive,
+                            keepalive_expiry=GROQ_KEEPALIVE_EXPIRY
+                        ),
+                        timeout=GROQ_TIMEOUT
+                    )
+                    # Retries are handled by the provider guard (app/core/resilience.py)
+                    self._groq = Groq(api_key=api_key, http_client=self._groq_http, max_retries=0)
+        return self._groq
+
+    def set_groq(self, client):
+        """Hand out client from groq() instead of a real Groq client (e.g. a local fake in benchmarks)"""
+        with self._lock:
+            self._groq = client
+
+    def cse_service(self):
+        """Shared Custom Search resource, or None when GOOGLE_API_KEY is not set"""
+        if self._cse_service is None:
+            api_key = os.getenv('GOOGLE_API_KEY')
+            if not api_key:
+                return None
+            with self._lock:
+                if self._cse_service is None:
+                    self._cse_service = build("customsearch", "v1", developerKey=api_key)
+        return self._cse_service
+
+    @contextmanager
+    def cse_http(self):
+        """Borrow a pooled httplib2 connection; blocks while all cse_pool_size are in use"""
+        self._cse_slots.acquire()
+        try:
+            try:
+                http = self._cse_pool.get_nowait()
+            except queue.Empty:
+                http = httplib2.Http(timeout=CSE_TIMEOUT)
+            try:
+                yield http
+            except Exception:
+                # The connection may be left mid-response; drop it rather than reuse it
+                http.close()
+                raise
+            self._cse_pool.put(http)
+        finally:
+            self._cse_slots.release()
+
+    def close(self):
+        with self._lock:
+            if self._groq_http is not None:
+                self._groq_http.close()
+            self._groq = self._groq_http = None
+            while True:
+                try:
+                    self._cse_pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
+
+
+def get_groq_client() -> Optional[Groq]:
+    return get_client_registry().groq()
+
+
+def shutdown_clients():
+    """Close every pooled connection; called from the FastAPI lifespan on shutdown"""
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close()
+            _registry = None
@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import hashlib
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.env import env_flag
+
+# Worker threads available to request handlers for blocking pipeline work
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 32))
+# Share one execution between concurrent identical API calls (see SingleFlight)
+COALESCE_REQUESTS = env_flag('COALESCE_REQUESTS', default=True)
+
+_pipeline_executor = None
+_pipeline_executor_lock = threading.Lock()
+
+
+def iter_concurrently(fn: Callable[[Any], Any], items: Iterable[Any], max_workers: int,
+                      call_timeout: float = None, deadline: float = None) -> Iterator[Tuple[int, Optional[Any]]]:
+    """Run fn over items on a bounded thread pool, yielding (index, result) as each call settles.
+
+    The result is None when the call raised or ran longer than call_timeout (measured from
+    when the call started, not when it was queued). Calls still unfinished when the overall
+    deadline (seconds from now) expires are not yielded at all. Unfinished calls are
+    abandoned, never waited for.
+    """
+    items = list(items)
+    if not items:
+        return
+
+    started = {}
+
+    def call(index):
+        started[index] = time.monotonic()
+        return fn(items[index])
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+    # Each call runs in a copy of the caller's context (context variables follow the work)
+    futures = {executor.submit(contextvars.copy_context().run, call, i): i for i in range(len(items))}
+    pending = set(futures)
+    end = None if deadline is None else time.monotonic() + deadline
+    try:
+        while pending:
+            now = time.monotonic()
+            if end is not None and now >= end:
+                break
+            waits = [] if end is None else [end - now]
+            if call_timeout is not None:
+                for future in list(pending):
+                    began = started.get(futures[future])
+                    if began is None or future.done():
+                        continue
+                    remaining = began + call_timeout - now
+                    if remaining <= 0:
+                        pending.discard(future)
+                        yield futures[future], None
+                    else:
+                        waits.append(remaining)
+                if not pending:
+                    break
+                if len(waits) == (0 if end is None else 1):
+                    waits.append(call_timeout)  # nothing has started yet
+            done, pending = wait(pending, timeout=min(waits) if waits else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Concurrent call failed: {e}")
+                    result = None
+                yield futures[future], result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_concurrently(fn: Callable[[Any], Any], items: Iterable[Any], max_workers: int,
+                     call_timeout: float = None, deadline: float = None) -> List[Optional[Any]]:
+    """Run fn over items on a bounded thread pool and return the results in input order.
+
+    A slot holds None when its call raised, timed out or had not finished by the deadline
+    (see iter_concurrently). Callers substitute their own fallback for those.
+    """
+    items = list(items)
+    results: List[Optional[Any]] = [None] * len(items)
+    for index, result in iter_concurrently(fn, items, max_workers, call_timeout, deadline):
+        results[index] = result
+    return results
+
+
+def call_with_timeout(fn: Callable[..., Any], timeout: Optional[float], *args, **kwargs) -> Optional[Any]:
+    """Call fn on a worker thread and return its result, or None if it raised or took longer than timeout"""
+    if timeout is None:
+        return fn(*args, **kwargs)
+    if timeout <= 0:
+        return None
+    return run_concurrently(lambda _: fn(*args, **kwargs), [None], 1, call_timeout=timeout, deadline=timeout)[0]
+
+
+# Default split of a request's time budget between the pipeline stages, in the order they run
+STAGE_SHARES = {"query_extraction": 0.1, "search": 0.25, "enrichment": 0.25, "ai_rescoring": 0.2, "outreach": 0.2}
+
+
+class Budget:
+    """A request's time budget, handed out stage by stage.
+
+    Each stage gets its share of the time that is left, relative to the stages still to
+    come, so time a stage does not use carries over to the later ones.
+    """
+
+    def __init__(self, seconds: float, shares: Dict[str, float] = None):
+        self.seconds = seconds
+        self.shares = dict(shares or STAGE_SHARES)
+        self.end = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.end - time.monotonic())
+
+    def for_stage(self, stage: str) -> float:
+        """Seconds the stage may use, starting now"""
+        stages = list(self.shares)
+        upcoming = sum(self.shares[s] for s in stages[stages.index(stage):])
+        return self.remaining() * self.shares[stage] / upcoming if upcoming else self.remaining()
+
+
+def get_pipeline_executor() -> ThreadPoolExecutor:
+    """Bounded pool that runs blocking search/scoring/outreach work off the event loop"""
+    global _pipeline_executor
+    if _pipeline_executor is None:
+        with _pipeline_executor_lock:
+            if _pipeline_executor is None:
+                _pipeline_executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline")
+    return _pipeline_executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await a blocking call on the pipeline executor, carrying the caller's context variables"""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_pipeline_executor(), call)
+
+
+def shutdown_pipeline_executor():
+    global _pipeline_executor
+    with _pipeline_executor_lock:
+        if _pipeline_executor is not None:
+            _pipeline_executor.shutdown(wait=False, cancel_futures=True)
+            _pipeline_executor = None
+
+
+def request_key(operation: str, job_description: str, **params) -> str:
+    """Digest identifying an API call: the operation, the job description with whitespace
+    collapsed, and every other parameter (candidate lists and weights included)"""
+    raw = json.dumps({"operation": operation, "description": " ".join((job_description or "").split()), **params},
+                     sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls on the event loop.
+
+    While a call for a key is in flight, later calls with the same key await its result
+    (or exception) instead of starting their own. The key is forgotten as soon as the call
+    settles, so nothing is cached beyond the calls that overlap. The shared call runs as its
+    own task: a caller that goes away does not cancel it for the others. Only use from the
+    event loop thread; it is not thread-safe.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """(result of await fn(*args, **kwargs), whether it was shared with an earlier identical call)"""
+        if not self.enabled:
+            return await fn(*args, **kwargs), False
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.started += 1
+            task = self._calls[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(functools.partial(self._settled, key))
+        return await asyncio.shield(task), shared
+
+    def _settled(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here too, so a call every caller gave up on is not reported as unhandled
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "in_flight": len(self._calls), "started": self.started, "coalesced": self.coalesced}
@@ -0,0 +1,359 @@
+import os
+import zlib
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+from app.core.profile_index import TOKEN_PATTERN, STOPWORDS, profile_text
+from app.core.profile_store import normalize_linkedin_url
+
+load_dotenv()
+
+DEFAULT_INDEX_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '.cache', 'embeddings.npz'))
+
+EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', 128))
+# IVF: at most this many clusters (about sqrt(N) are used), of which IVF_PROBES are searched per query
+IVF_MAX_LISTS = int(os.getenv('IVF_MAX_LISTS', 1024))
+IVF_PROBES = int(os.getenv('IVF_PROBES', 16))
+# Below this many vectors the index is searched exhaustively and not clustered yet
+IVF_TRAIN_THRESHOLD = int(os.getenv('IVF_TRAIN_THRESHOLD', 4096))
+
+# Stored profiles retrieved semantically before rubric scoring picks the top-k among them
+SEMANTIC_PREFILTER_SIZE = int(os.getenv('SEMANTIC_PREFILTER_SIZE', 500))
+
+FORMAT_VERSION = 1
+
+# Terms that share a concept also share a feature, so related skills land near each other
+# ("pytorch" and "deep learning frameworks" both carry the deep_learning concept)
+CONCEPTS = {
+    "deep_learning": ["pytorch", "tensorflow", "keras", "jax", "deep learning", "neural network", "neural networks",
+                      "deep learning frameworks", "cnn", "rnn"],
+    "machine_learning": ["ml", "machine learning", "scikit-learn", "sklearn", "xgboost", "data science", "mlops"],
+    "language_models": ["llm", "llms", "large language model", "large language models", "transformer", "transformers",
+                        "nlp", "gpt", "rag", "generative ai", "genai"],
+    "cloud_infra": ["aws", "gcp", "azure", "kubernetes", "docker", "terraform", "cloud", "devops", "sre"],
+    "data_engineering": ["sql", "spark", "hadoop", "kafka", "airflow", "etl", "data engineering", "postgresql", "snowflake"],
+    "frontend": ["react", "javascript", "typescript", "vue", "angular", "frontend", "front-end", "css"],
+    "backend": ["go", "golang", "java", "node.js", "backend", "back-end", "microservices", "api", "graphql"],
+    "systems": ["c++", "rust", "embedded", "systems programming", "low latency"]
+}
+_CONCEPT_WORDS: Dict[str, List[str]] = {}
+_CONCEPT_PHRASES: List[Tuple[str, str]] = []
+for _concept, _terms in CONCEPTS.items():
+    for _term in _terms:
+        if " " in _term:
+            _CONCEPT_PHRASES.append((_term, _concept))
+        else:
+            _CONCEPT_WORDS.setdefault(_term, []).append(_concept)
+
+
+class HashedEmbedder:
+    """Feature-hashed profile vectors: words, character trigrams and CONCEPTS, L2-normalized.
+
+    Hashing uses crc32, not hash(), so vectors are identical across processes and can be
+    persisted. No model download; embedding a profile costs a few dozen hash lookups.
+    """
+
+    def __init__(self, dim: int = None, word_weight: float = 1.0, trigram_weight: float = 0.3,
+                 concept_weight: float = 1.5):
+        self.dim = dim or EMBEDDING_DIM
+        self.word_weight = word_weight
+        self.trigram_weight = trigram_weight
+        self.concept_weight = concept_weight
+        self._token_features = lru_cache(maxsize=100000)(self._features_of_token)
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        h = zlib.crc32(feature.encode("utf-8"))
+        return h % self.dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+    def _features_of_token(self, token: str) -> Tuple[Tuple[int, float], ...]:
+        features = [(*self._bucket("w:" + token), self.word_weight)]
+        padded = f"<{token}>"
+        features.extend((*self._bucket("g:" + padded[i:i + 3]), self.trigram_weight) for i in range(len(padded) - 2))
+        features.extend((*self._bucket("c:" + concept), self.concept_weight) for concept in _CONCEPT_WORDS.get(token, ()))
+        return tuple((bucket, sign * weight) for bucket, sign, weight in features)
+
+    def embed(self, text: str) -> np.ndarray:
+        lower = text.lower()
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(lower):
+            token = token.rstrip(".")
+            if token in STOPWORDS:
+                continue
+            for bucket, value in self._token_features(token):
+                vector[bucket] += value
+        for phrase, concept in _CONCEPT_PHRASES:
+            if phrase in lower:
+                bucket, sign = self._bucket("c:" + concept)
+                vector[bucket] += sign * self.concept_weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        vectors = [self.embed(text) for text in texts]
+        return np.array(vectors, dtype=np.float32).reshape(len(vectors), self.dim)
+
+
+def _kmeans(sample: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means (cosine) over unit vectors; returns unit centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed empty clusters with random points so every list stays in use
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        block = vectors[start:start + chunk].astype(np.float32)
+        assign[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+class EmbeddingIndex:
+    """Approximate nearest-neighbour (IVF) index of profile vectors keyed by normalized LinkedIn URL.
+
+    Vectors are clustered with spherical k-means into about sqrt(N) inverted lists; a query
+    scans only the nprobe lists whose centroids are closest. Inserts are incremental: new
+    vectors join their nearest list, and re-adding a key replaces its vector. Until
+    train_threshold vectors exist the index is searched exhaustively. Vectors are kept as
+    float16 and the whole index is saved to / loaded from one .npz file.
+    """
+
+    def __init__(self, embedder: HashedEmbedder = None, path: str = None, max_lists: int = None, nprobe: int = None,
+                 train_threshold: int = None):
+        self.embedder = embedder or HashedEmbedder()
+        self.dim = self.embedder.dim
+        self.path = path or os.getenv('EMBEDDING_INDEX_PATH', DEFAULT_INDEX_PATH)
+        self.max_lists = max_lists or IVF_MAX_LISTS
+        self.nprobe = nprobe or IVF_PROBES
+        self.train_threshold = IVF_TRAIN_THRESHOLD if train_threshold is None else train_threshold
+        self.trained_size = 0
+        self._vectors = np.zeros((0, self.dim), dtype=np.float16)
+        self._assign = np.zeros(0, dtype=np.int32)  # inverted list of each row, -1 until clustered
+        self._keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, linkedin_url: str) -> bool:
+        return normalize_linkedin_url(linkedin_url) in self._positions
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def add_candidates(self, candidates: Sequence[Dict[str, Any]]):
+        """Embed and insert (or replace) candidate profiles"""
+        if not candidates:
+            return
+        keys = [normalize_linkedin_url(c["linkedin_url"]) for c in candidates]
+        self.add_vectors(keys, self.embedder.embed_many(profile_text(c) for c in candidates))
+
+    def add_vectors(self, keys: Sequence[str], vectors: np.ndarray):
+        with self._lock:
+            rows = []
+            for key in keys:
+                position = self._positions.get(key)
+                if position is None:
+                    position = self._positions[key] = len(self._keys)
+                    self._keys.append(key)
+                rows.append(position)
+            self._reserve(len(self._keys))
+            self._vectors[rows] = vectors.astype(np.float16)
+            if self.trained:
+                for row, cluster in zip(rows, _nearest(vectors, self._centroids).tolist()):
+                    self._move(row, cluster)
+            elif len(self._keys) >= self.train_threshold:
+                self.train()
+
+    def _move(self, row: int, cluster: int):
+        previous = int(self._assign[row])
+        if previous == cluster:
+            return
+        if previous >= 0:
+            self._lists[previous].remove(row)
+            self._list_arrays.pop(previous, None)
+        self._lists[cluster].append(row)
+        self._list_arrays.pop(cluster, None)
+        self._assign[row] = cluster
+
+    def _reserve(self, size: int):
+        if size <= len(self._vectors):
+            return
+        capacity = max(size, 2 * len(self._vectors), 1024)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float16)
+        vectors[:len(self._vectors)] = self._vectors
+        assign = np.full(capacity, -1, dtype=np.int32)
+        assign[:len(self._assign)] = self._assign
+        self._vectors, self._assign = vectors, assign
+
+    def _build_lists(self, clusters: int):
+        size = len(self._keys)
+        order = np.argsort(self._assign[:size], kind="stable")
+        bounds = np.searchsorted(self._assign[:size][order], np.arange(clusters + 1))
+        self._lists = [order[bounds[c]:bounds[c + 1]].tolist() for c in range(clusters)]
+        self._list_arrays = {}
+
+    def train(self, sample_size: int = 65536, iterations: int = 10, seed: int = 0):
+        """(Re)cluster every vector; call after the index has grown a lot since it was trained"""
+        with self._lock:
+            size = len(self._keys)
+            if size == 0:
+                return
+            lists = max(1, min(self.max_lists, int(np.sqrt(size))))
+            rng = np.random.default_rng(seed)
+            picked = rng.choice(size, min(size, max(sample_size, lists)), replace=False)
+            sample = self._vectors[np.sort(picked)].astype(np.float32)
+            self._centroids = _kmeans(sample, lists, iterations, seed)
+            self._assign[:size] = _nearest(self._vectors[:size], self._centroids)
+            self._build_lists(lists)
+            self.trained_size = size
+
+    def _members(self, cluster: int) -> np.ndarray:
+        members = self._list_arrays.get(cluster)
+        if members is None:
+            members = self._list_arrays[cluster] = np.array(self._lists[cluster], dtype=np.int64)
+        return members
+
+    def search(self, query: str, k: int = 10, nprobe: int = None) -> List[Tuple[str, float]]:
+        """(normalized URL, cosine similarity) of the k profiles nearest to the query text, best first"""
+        return self.search_vector(self.embedder.embed(query), k, nprobe)
+
+    def search_vector(self, vector: np.ndarray, k: int = 10, nprobe: int = None) -> List[Tuple[str, float]]:
+        with self._lock:
+            size = len(self._keys)
+            if not size or k <= 0 or not np.any(vector):
+                return []
+            vector = vector.astype(np.float32)
+            if self.trained:
+                probes = min(nprobe or self.nprobe, len(self._centroids))
+                closest = np.argpartition(-(self._centroids @ vector), probes - 1)[:probes]
+                rows = np.concatenate([self._members(c) for c in closest.tolist()])
+            else:
+                rows = np.arange(size)
+            if not len(rows):
+                return []
+            scores = self._vectors[rows].astype(np.float32) @ vector
+            if k < len(rows):
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.lexsort((rows[top], -scores[top]))]
+            return [(self._keys[rows[i]], round(float(scores[i]), 4)) for i in top.tolist()]
+
+    def missing(self, candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [c for c in candidates if c["linkedin_url"] not in self]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "profiles": len(self._keys),
+                "dim": self.dim,
+                "lists": len(self._centroids) if self.trained else 0,
+                "nprobe": self.nprobe
+            }
+
+    def save(self, path: str = None):
+        """Write the index atomically (temp file + rename)"""
+        path = path or self.path
+        with self._lock:
+            size = len(self._keys)
+            payload = {
+                "version": np.array(FORMAT_VERSION),
+                "dim": np.array(self.dim),
+                "vectors": self._vectors[:size],
+                "assign": self._assign[:size],
+                "keys": np.frombuffer("\n".join(self._keys).encode("utf-8"), dtype=np.uint8),
+                "centroids": self._centroids if self.trained else np.zeros((0, self.dim), dtype=np.float32)
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **payload)
+            os.replace(tmp_path, path)
+
+    def load(self, path: str = None) -> bool:
+        """Load a saved index; returns False (leaving the index empty) when there is none or it does not match"""
+        path = path or self.path
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != FORMAT_VERSION or int(data["dim"]) != self.dim:
+                    print(f"Ignoring embedding index at {path}: built with another format or dimension")
+                    return False
+                vectors, assign, centroids = data["vectors"], data["assign"], data["centroids"]
+                raw_keys = data["keys"].tobytes().decode("utf-8")
+        except Exception as e:
+            print(f"Could not load embedding index from {path}: {e}")
+            return False
+        keys = raw_keys.split("\n") if raw_keys else []
+        with self._lock:
+            self._keys = keys
+            self._positions = {key: i for i, key in enumerate(keys)}
+            self._vectors, self._assign = np.zeros((0, self.dim), dtype=np.float16), np.zeros(0, dtype=np.int32)
+            self._reserve(len(keys))
+            self._vectors[:len(keys)] = vectors
+            self._assign[:len(keys)] = assign
+            self._centroids = centroids.astype(np.float32) if len(centroids) else None
+            if self.trained:
+                self._build_lists(len(centroids))
+                self.trained_size = len(keys)
+            else:
+                self._lists, self._list_arrays = [], {}
+        return True
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_embedding_index(candidates: Iterable[Dict[str, Any]] = ()) -> EmbeddingIndex:
+    """Process-wide embedding index: loaded from EMBEDDING_INDEX_PATH on first use, then topped up
+    with any of candidates (normally the stored profiles) it does not hold yet"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = EmbeddingIndex()
+                index.load()
+                missing = index.missing(candidates)
+                if missing:
+                    index.add_candidates(missing)
+                if index.trained and len(index) >= 4 * index.trained_size:
+                    # Lists were sized for a much smaller index; recluster so scans stay short
+                    index.train()
+                if missing:
+                    try:
+                        index.save()
+                    except OSError as e:
+                        print(f"Could not save embedding index: {e}")
+                _index = index
+    return _index
+
+
+def save_embedding_index():
+    """Persist the process-wide index; called from the FastAPI lifespan on shutdown"""
+    with _index_lock:
+        if _index is not None:
+            try:
+                _index.save()
+            except OSError as e:
+                print(f"Could not save embedding index: {e}")
@@ -1,15 +1,24 @@
 import os
-from groq import Groq
 from dotenv import load_dotenv
 import json
+import threading
+from app.core.llm_cache import cached_completion
+from app.core.clients import get_groq_client
+from app.core.resilience import record_degraded, describe_failure
+from app.core.metrics import span
+from app.core.concurrency import iter_concurrently
 
 load_dotenv()
 
+# Parallel message generation and how long one message may take before the basic template is used
+OUTREACH_CONCURRENCY = int(os.getenv('OUTREACH_CONCURRENCY', 8))
+OUTREACH_TIMEOUT = float(os.getenv('OUTREACH_TIMEOUT_SECONDS', 10))
+
 class EnhancedOutreach:
     def __init__(self):
-        self.groq_api_key = os.getenv('GROQ_API_KEY')
-        if self.groq_api_key:
-            self.groq_client = Groq(api_key=self.groq_api_key)
+        # The shared client is None when GROQ_API_KEY is not set (and no client was injected)
+        self.groq_client = get_groq_client()
+        if self.groq_client is not None:
             self.use_groq = True
         else:
             print("Warning: Groq API key not found. Using basic outreach.")
@@ -56,14 +65,14 @@ class EnhancedOutreach:
         """
         
         try:
-            response = self.groq_client.chat.completions.create(
+            message = cached_completion(
+                self.groq_client,
                 model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
+                prompt=prompt,
                 temperature=0.7,
                 max_tokens=200
             )
-            
-            message = response.choices[0].message.content.strip()
+            message = (message or "").strip()
             
             # Clean up the message
             if message.startswith('"') and message.endswith('"'):
@@ -73,6 +82,7 @@ class EnhancedOutreach:
                 
         except Exception as e:
             print(f"Error generating message with Groq: {e}")
+            record_degraded("outreach", describe_failure(e), candidate.get("linkedin_url"))
             return self._generate_basic_message(candidate, job_description)
 
     def _generate_basic_message(self, candidate, job_description):
@@ -92,19 +102,74 @@ class EnhancedOutreach:
         
         return message
 
-def generate_outreach_enhanced(scored_candidates, job_description):
-    """Enhanced outreach generation using Groq API"""
-    outreach_generator = EnhancedOutreach()
-    messages = []
-    
-    for candidate in scored_candidates:
-        message = outreach_generator.generate_personalized_message(candidate, job_description)
-        
-        messages.append({
-            "candidate": candidate["name"],
-            "message": message,
-            "score": candidate.get("score", 0),
-            "linkedin_url": candidate.get("linkedin_url", "")
-        })
-    
-    return messages 
+_generator = None
+_generator_lock = threading.Lock()
+
+def get_outreach_generator():
+    """Long-lived EnhancedOutreach (and Groq client) shared by every request"""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = EnhancedOutreach()
+    return _generator
+
+def reset_outreach_generator():
+    """Drop the shared generator so the next request builds one with the current Groq client"""
+    global _generator
+    with _generator_lock:
+        _generator = None
+
+def _timed_message(outreach_generator, candidate, job_description):
+    with span("outreach_message"):
+        return outreach_generator.generate_personalized_message(candidate, job_description)
+
+def iter_outreach_enhanced(scored_candidates, job_description, max_concurrency=None, message_timeout=None, deadline=None):
+    """Yield (index, message) pairs as each outreach message completes.
+
+    Messages are generated concurrently; one that fails or exceeds message_timeout
+    falls back to the basic template, as does every message still pending after
+    deadline seconds.
+    """
+    outreach_generator = get_outreach_generator()
+    if message_timeout is None:
+        message_timeout = OUTREACH_TIMEOUT
+    if deadline is not None:
+        message_timeout = min(message_timeout, deadline)
+    finished = set()
+    if deadline is None or deadline > 0:
+        generated = iter_concurrently(
+            lambda candidate: _timed_message(outreach_generator, candidate, job_description),
+            scored_candidates,
+            max_workers=max_concurrency or OUTREACH_CONCURRENCY,
+            call_timeout=message_timeout,
+            deadline=deadline
+        )
+        for index, message in generated:
+            finished.add(index)
+            candidate = scored_candidates[index]
+            if message is None:
+                record_degraded("outreach", "timeout", candidate.get("linkedin_url"))
+                message = outreach_generator._generate_basic_message(candidate, job_description)
+            yield index, _outreach_entry(candidate, message)
+    for index, candidate in enumerate(scored_candidates):
+        if index not in finished:
+            record_degraded("outreach", "deadline", candidate.get("linkedin_url"))
+            yield index, _outreach_entry(candidate, outreach_generator._generate_basic_message(candidate, job_description))
+
+def _outreach_entry(candidate, message):
+    return {
+        "candidate": candidate["name"],
+        "message": message,
+        "score": candidate.get("score", 0),
+        "linkedin_url": candidate.get("linkedin_url", "")
+    }
+
+def generate_outreach_enhanced(scored_candidates, job_description, max_concurrency=None, message_timeout=None, deadline=None):
+    """Enhanced outreach generation using Groq API (concurrent; results keep the input order)"""
+    messages = [None] * len(scored_candidates)
+    with span("outreach"):
+        for index, message in iter_outreach_enhanced(scored_candidates, job_description, max_concurrency, message_timeout,
+                                                     deadline):
+            messages[index] = message
+    return messages
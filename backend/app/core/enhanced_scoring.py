@@ -1,12 +1,26 @@
 import os
 import re
 import json
-from typing import Dict, List, Any
-from groq import Groq
+import heapq
+from functools import lru_cache
+from typing import Dict, List, Any, Union, Iterable, Tuple
 from dotenv import load_dotenv
+from app.core.llm_cache import cached_completion
+from app.core.clients import get_groq_client
+from app.core.resilience import record_degraded, describe_failure
+from app.core.metrics import span
+from app.core.keyword_matcher import KeywordMatcher
+from app.core.concurrency import run_concurrently
 
 load_dotenv()
 
+# AI rescoring of the top-N candidates: how many, how many at once, and how long to wait
+AI_RESCORE_TOP_N = int(os.getenv('AI_RESCORE_TOP_N', 5))
+AI_RESCORE_CONCURRENCY = int(os.getenv('AI_RESCORE_CONCURRENCY', 5))
+AI_RESCORE_CALL_TIMEOUT = float(os.getenv('AI_RESCORE_CALL_TIMEOUT_SECONDS', 8))
+AI_RESCORE_DEADLINE = float(os.getenv('AI_RESCORE_DEADLINE_SECONDS', 12))
+AI_RESCORE_BATCH_SIZE = int(os.getenv('AI_RESCORE_BATCH_SIZE', 1))
+
 # Elite and strong schools for education scoring
 ELITE_SCHOOLS = {
     "mit", "stanford", "harvard", "caltech", "princeton", "berkeley", "oxford", "cambridge", "yale",
@@ -60,104 +74,165 @@ TECH_SKILLS = {
     "api", "rest", "graphql", "cloud", "azure", "gcp", "devops", "agile", "scrum"
 }
 
+EDUCATION_WORDS = {"university", "institute", "college"}
+TECH_ROLE_WORDS = {"engineer", "developer", "scientist", "architect"}
+JOB_HOPPING_WORDS = {"months", "mo", "job hopping", "frequent"}
+
+# Location hits resolve to the first matching entry of LOCATION_KEYWORDS, so they are ranked by position
+LOCATION_SCORES = list(LOCATION_KEYWORDS.values())
+
+# One automaton over every keyword dictionary; each candidate field is scanned once
+KEYWORD_MATCHER = KeywordMatcher(
+    [(kw, "elite_school", 0) for kw in ELITE_SCHOOLS] +
+    [(kw, "strong_school", 0) for kw in STRONG_SCHOOLS] +
+    [(kw, "education_word", 0) for kw in EDUCATION_WORDS] +
+    [(kw, "senior_role", 0) for kw in SENIOR_ROLES] +
+    [(kw, "mid_role", 0) for kw in MID_LEVEL_ROLES] +
+    [(kw, "junior_role", 0) for kw in JUNIOR_ROLES] +
+    [(kw, "top_company", 0) for kw in TOP_TECH_COMPANIES] +
+    [(kw, "industry", 0) for kw in RELEVANT_INDUSTRIES] +
+    [(kw, "tech_role", 0) for kw in TECH_ROLE_WORDS] +
+    [(kw, "job_hopping", 0) for kw in JOB_HOPPING_WORDS] +
+    [(kw, "location", rank) for rank, kw in enumerate(LOCATION_KEYWORDS)]
+)
+
+# Rubric shared by the single-candidate and batched LLM scoring prompts
+SCORING_RUBRIC = """**Education (20%)**: Elite schools (MIT, Stanford, etc.): 9-10, Strong schools: 7-8, Standard universities: 5-6
+        **Career Trajectory (20%)**: Steady growth: 6-8, Limited progression: 3-5
+        **Company Relevance (15%)**: Top tech companies: 9-10, Relevant industry: 7-8, Any experience: 5-6
+        **Experience Match (25%)**: Perfect skill match: 9-10, Strong overlap: 7-8, Some relevant skills: 5-6
+        **Location Match (10%)**: Exact city: 10, Same metro: 8, Remote-friendly: 6
+        **Tenure (10%)**: 2-3 years average: 9-10, 1-2 years: 6-8, Job hopping: 3-5"""
+
+# One {"id": ..., "breakdown": {...}} object inside a batched scoring reply
+BATCH_ENTRY_PATTERN = re.compile(r'\{[^{}]*"id"[^{}]*(?:\{[^{}]*\}[^{}]*)?\}')
+
+SKILL_PATTERN = re.compile(r'\b[A-Za-z0-9\+\#\.]+\b')
+
+
+class JobProfile:
+    """A job description compiled once and shared by every candidate scored against it"""
+
+    def __init__(self, job_description: str):
+        self.job_description = job_description
+        self.required_skills = frozenset(SKILL_PATTERN.findall(job_description.lower()))
+        # Index of required skills: one scan of the candidate text finds every skill it contains
+        self.skill_matcher = KeywordMatcher((skill, "skill", 0) for skill in self.required_skills)
+
+    def count_skill_matches(self, candidate: Dict[str, Any]) -> int:
+        """Number of distinct required skills found in the candidate's headline, title or skills"""
+        return self.count_skill_matches_in(skill_text(candidate))
+
+    def count_skill_matches_in(self, text: str) -> int:
+        """Same as count_skill_matches, for text already built with skill_text()"""
+        return len(self.skill_matcher.keywords_in(text))
+
+
+def skill_text(candidate: Dict[str, Any]) -> str:
+    """Lowercased headline, title and skills; the newline separator never occurs inside a skill token"""
+    fields = [candidate.get("headline", ""), candidate.get("title", "")] + list(candidate.get("skills", []))
+    return "\n".join(fields).lower()
+
+
+@lru_cache(maxsize=256)
+def get_job_profile(job_description: str) -> JobProfile:
+    """Memoized JobProfile, reused across requests for the same description"""
+    return JobProfile(job_description)
+
+
+def _as_job_profile(job: Union[str, JobProfile]) -> JobProfile:
+    return job if isinstance(job, JobProfile) else get_job_profile(job)
+
+
 class OptimizedScoring:
     def __init__(self):
-        self.groq_api_key = os.getenv('GROQ_API_KEY')
-        self.use_ai = bool(self.groq_api_key)
-        if self.use_ai:
-            self.groq_client = Groq(api_key=self.groq_api_key)
+        # The shared client is None when GROQ_API_KEY is not set (and no client was injected)
+        self.groq_client = get_groq_client()
+        self.use_ai = self.groq_client is not None
         
         # Pre-compile regex patterns for better performance
-        self.skill_pattern = re.compile(r'\b[A-Za-z0-9\+\#\.]+\b')
+        self.skill_pattern = SKILL_PATTERN
         self.year_pattern = re.compile(r'\b(?:20\d{2}|19\d{2})\b')
         self.duration_pattern = re.compile(r'\b(\d+)\s*(?:years?|yrs?|months?|mos?)\b')
 
-    def get_education_score(self, candidate: Dict[str, Any]) -> float:
+    def extract_features(self, candidate: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+        """Scan each candidate field once and return the dictionary categories it hits"""
+        return {
+            "headline": KEYWORD_MATCHER.scan(candidate.get("headline", "").lower()),
+            "title": KEYWORD_MATCHER.scan(candidate.get("title", "").lower()),
+            "education": KEYWORD_MATCHER.scan("\n".join(e.lower() for e in candidate.get("education", []))),
+            "companies": KEYWORD_MATCHER.scan("\n".join(c.lower() for c in candidate.get("companies", []))),
+            "location": KEYWORD_MATCHER.scan(candidate.get("location", "").lower())
+        }
+
+    def get_education_score(self, candidate: Dict[str, Any], features: Dict[str, Dict[str, int]] = None) -> float:
         """Score education based on school prestige and progression"""
-        education_list = [e.lower() for e in candidate.get("education", [])]
-        headline = candidate.get("headline", "").lower()
-        title = candidate.get("title", "").lower()
+        features = features or self.extract_features(candidate)
+        education = features["education"]
+        headline, title = features["headline"], features["title"]
         
         # Check AI-extracted education first
-        for school in ELITE_SCHOOLS:
-            if any(school in edu for edu in education_list):
-                return 9.5  # Elite school with clear progression
+        if "elite_school" in education:
+            return 9.5  # Elite school with clear progression
         
-        for school in STRONG_SCHOOLS:
-            if any(school in edu for edu in education_list):
-                return 8.0  # Strong school
+        if "strong_school" in education:
+            return 8.0  # Strong school
         
         # Fallback: check headline/title for school mentions
-        for school in ELITE_SCHOOLS:
-            if school in headline or school in title:
-                return 9.0
+        if "elite_school" in headline or "elite_school" in title:
+            return 9.0
         
-        for school in STRONG_SCHOOLS:
-            if school in headline or school in title:
-                return 7.5
+        if "strong_school" in headline or "strong_school" in title:
+            return 7.5
         
         # Check for any university/institute mention
-        if any(word in headline or word in title for word in ["university", "institute", "college"]):
+        if "education_word" in headline or "education_word" in title:
             return 6.0
         
         return 4.0  # No education info found
 
-    def get_trajectory_score(self, candidate: Dict[str, Any]) -> float:
+    def get_trajectory_score(self, candidate: Dict[str, Any], features: Dict[str, Dict[str, int]] = None) -> float:
         """Score career trajectory based on role progression"""
-        headline = candidate.get("headline", "").lower()
+        headline = (features or self.extract_features(candidate))["headline"]
         
         # Check for senior leadership roles
-        if any(role in headline for role in SENIOR_ROLES):
+        if "senior_role" in headline:
             return 8.5  # Steady growth to leadership
         
         # Check for mid-level progression
-        if any(role in headline for role in MID_LEVEL_ROLES):
+        if "mid_role" in headline:
             return 7.0  # Good progression
         
         # Check for junior roles
-        if any(role in headline for role in JUNIOR_ROLES):
+        if "junior_role" in headline:
             return 4.0  # Limited progression
         
         # Default for mid-level roles
         return 6.0
 
-    def get_company_score(self, candidate: Dict[str, Any]) -> float:
+    def get_company_score(self, candidate: Dict[str, Any], features: Dict[str, Dict[str, int]] = None) -> float:
         """Score company relevance based on tech companies and industry"""
-        headline = candidate.get("headline", "").lower()
-        companies = [c.lower() for c in candidate.get("companies", [])]
+        features = features or self.extract_features(candidate)
+        headline = features["headline"]
         
         # Check for top tech companies
-        for company in TOP_TECH_COMPANIES:
-            if company in headline or any(company in c for c in companies):
-                return 9.5  # Top tech company experience
+        if "top_company" in headline or "top_company" in features["companies"]:
+            return 9.5  # Top tech company experience
         
         # Check for relevant industry experience
-        for industry in RELEVANT_INDUSTRIES:
-            if industry in headline:
-                return 7.5  # Relevant industry
+        if "industry" in headline:
+            return 7.5  # Relevant industry
         
         # Check for any engineering/tech role
-        if any(word in headline for word in ["engineer", "developer", "scientist", "architect"]):
+        if "tech_role" in headline:
             return 6.0  # Tech experience
         
         return 5.0  # No relevant experience
 
-    def get_experience_score(self, candidate: Dict[str, Any], job_description: str) -> float:
+    def get_experience_score(self, candidate: Dict[str, Any], job_description: Union[str, JobProfile]) -> float:
         """Score experience match based on skills and job requirements"""
-        headline = candidate.get("headline", "").lower()
-        title = candidate.get("title", "").lower()
-        skills = [s.lower() for s in candidate.get("skills", [])]
-        
-        # Extract skills from job description
-        job_desc = job_description.lower()
-        required_skills = set(self.skill_pattern.findall(job_desc))
-        
-        # Count skill matches
-        skill_matches = 0
-        for skill in required_skills:
-            if (skill in headline or skill in title or 
-                skill in skills or any(skill in s for s in skills)):
-                skill_matches += 1
+        # Count skill matches against the compiled job description
+        skill_matches = _as_job_profile(job_description).count_skill_matches(candidate)
         
         # Score based on matches
         if skill_matches >= 4:
@@ -171,20 +246,19 @@ class OptimizedScoring:
         else:
             return 5.0  # No clear skill match
 
-    def get_location_score(self, candidate: Dict[str, Any]) -> float:
+    def get_location_score(self, candidate: Dict[str, Any], features: Dict[str, Dict[str, int]] = None) -> float:
         """Score location match based on proximity to job location"""
-        headline = candidate.get("headline", "").lower()
-        location = candidate.get("location", "").lower()
+        features = features or self.extract_features(candidate)
+        ranks = [f["location"] for f in (features["headline"], features["location"]) if "location" in f]
         
-        # Check for exact location matches
-        for loc, score in LOCATION_KEYWORDS.items():
-            if loc in headline or loc in location:
-                return score
+        # Check for exact location matches (earliest LOCATION_KEYWORDS entry wins)
+        if ranks:
+            return LOCATION_SCORES[min(ranks)]
         
         # Default score for other locations
         return 7.0
 
-    def get_tenure_score(self, candidate: Dict[str, Any]) -> float:
+    def get_tenure_score(self, candidate: Dict[str, Any], features: Dict[str, Dict[str, int]] = None) -> float:
         """Score tenure based on job duration patterns"""
         headline = candidate.get("headline", "").lower()
         
@@ -205,20 +279,21 @@ class OptimizedScoring:
                 return 8.0  # Recent but stable
         
         # Check for job hopping indicators
-        if any(word in headline for word in ["months", "mo", "job hopping", "frequent"]):
+        if "job_hopping" in (features or self.extract_features(candidate))["headline"]:
             return 4.0  # Job hopping
         
         return 7.0  # Default stable tenure
 
-    def score_candidate_basic(self, candidate: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+    def score_candidate_basic(self, candidate: Dict[str, Any], job_description: Union[str, JobProfile]) -> Dict[str, Any]:
         """Fast basic scoring without AI"""
+        features = self.extract_features(candidate)
         breakdown = {
-            "education": self.get_education_score(candidate),
-            "trajectory": self.get_trajectory_score(candidate),
-            "company": self.get_company_score(candidate),
+            "education": self.get_education_score(candidate, features),
+            "trajectory": self.get_trajectory_score(candidate, features),
+            "company": self.get_company_score(candidate, features),
             "experience": self.get_experience_score(candidate, job_description),
-            "location": self.get_location_score(candidate),
-            "tenure": self.get_tenure_score(candidate)
+            "location": self.get_location_score(candidate, features),
+            "tenure": self.get_tenure_score(candidate, features)
         }
         
         # Calculate weighted total score
@@ -237,13 +312,42 @@ class OptimizedScoring:
             "reasoning": {}
         }
 
-    def score_candidate_with_ai(self, candidate: Dict[str, Any], job_description: str) -> Dict[str, Any]:
-        """Enhanced scoring with AI analysis for top candidates"""
-        if not self.use_ai:
-            return self.score_candidate_basic(candidate, job_description)
-        
-        # Prepare candidate data
-        candidate_info = {
+    def score_candidate_entry(self, candidate: Dict[str, Any], job_description: Union[str, JobProfile]) -> Dict[str, Any]:
+        """Basic score of a candidate in the response shape used by the scoring endpoints"""
+        scoring_result = self.score_candidate_basic(candidate, job_description)
+        return {
+            "name": candidate["name"],
+            "linkedin_url": candidate["linkedin_url"],
+            "headline": candidate.get("headline", ""),
+            "score": scoring_result["score"],
+            "breakdown": scoring_result["breakdown"],
+            "reasoning": scoring_result.get("reasoning", {})
+        }
+
+    def top_k(self, candidates: Iterable[Dict[str, Any]], job_description: Union[str, JobProfile],
+              k: int) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Stream candidates through a bounded min-heap and return (scored, candidate) pairs, best first.
+
+        Memory is O(k) however many candidates the iterable yields. Ties keep input order,
+        as with a stable sort.
+        """
+        job_profile = _as_job_profile(job_description)
+        heap = []  # (score, -index, scored, candidate); the root is the weakest entry kept
+        for index, candidate in enumerate(candidates):
+            if k <= 0:
+                break
+            scored = self.score_candidate_entry(candidate, job_profile)
+            entry = (scored["score"], -index, scored, candidate)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        heap.sort(key=lambda entry: entry[:2], reverse=True)
+        return [(scored, candidate) for _, _, scored, candidate in heap]
+
+    def _candidate_info(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Candidate fields sent to the LLM"""
+        return {
             "name": candidate.get("name", ""),
             "headline": candidate.get("headline", ""),
             "education": candidate.get("education", []),
@@ -254,16 +358,28 @@ class OptimizedScoring:
             "role_level": candidate.get("role_level", ""),
             "industry": candidate.get("industry", "")
         }
+
+    @staticmethod
+    def _ai_scoring_result(scoring_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize one parsed LLM score; raises on malformed values"""
+        return {
+            "score": round(float(scoring_result.get("total_score", 5.0)), 1),
+            "breakdown": {k: round(float(v), 1) for k, v in scoring_result.get("breakdown", {}).items()},
+            "reasoning": {}
+        }
+
+    def score_candidate_with_ai(self, candidate: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """Enhanced scoring with AI analysis for top candidates"""
+        if not self.use_ai:
+            return self.score_candidate_basic(candidate, job_description)
+        
+        # Prepare candidate data
+        candidate_info = self._candidate_info(candidate)
         
         prompt = f"""
         Score this candidate for the given job using this exact rubric:
 
-        **Education (20%)**: Elite schools (MIT, Stanford, etc.): 9-10, Strong schools: 7-8, Standard universities: 5-6
-        **Career Trajectory (20%)**: Steady growth: 6-8, Limited progression: 3-5  
-        **Company Relevance (15%)**: Top tech companies: 9-10, Relevant industry: 7-8, Any experience: 5-6
-        **Experience Match (25%)**: Perfect skill match: 9-10, Strong overlap: 7-8, Some relevant skills: 5-6
-        **Location Match (10%)**: Exact city: 10, Same metro: 8, Remote-friendly: 6
-        **Tenure (10%)**: 2-3 years average: 9-10, 1-2 years: 6-8, Job hopping: 3-5
+        {SCORING_RUBRIC}
 
         Job Description: {job_description}
         Candidate: {json.dumps(candidate_info, indent=2)}
@@ -272,69 +388,167 @@ class OptimizedScoring:
         """
         
         try:
-            response = self.groq_client.chat.completions.create(
+            result = cached_completion(
+                self.groq_client,
                 model="llama3-8b-8192",
-                messages=[{"role": "user", "content": prompt}],
+                prompt=prompt,
                 temperature=0.1,
                 max_tokens=300
             )
-            
-            result = response.choices[0].message.content
             if result:
                 result = result.strip()
             else:
+                record_degraded("ai_scoring", "empty_response", candidate.get("linkedin_url"))
                 return self.score_candidate_basic(candidate, job_description)
             json_start = result.find('{')
             json_end = result.rfind('}') + 1
             
             if json_start != -1 and json_end != 0:
-                scoring_result = json.loads(result[json_start:json_end])
-                return {
-                    "score": round(scoring_result.get("total_score", 5.0), 1),
-                    "breakdown": {k: round(v, 1) for k, v in scoring_result.get("breakdown", {}).items()},
-                    "reasoning": {}
-                }
+                return self._ai_scoring_result(json.loads(result[json_start:json_end]))
+            record_degraded("ai_scoring", "unparseable", candidate.get("linkedin_url"))
         except Exception as e:
             print(f"AI scoring failed for {candidate.get('name', 'Unknown')}: {e}")
+            record_degraded("ai_scoring", describe_failure(e), candidate.get("linkedin_url"))
         
         # Fallback to basic scoring
         return self.score_candidate_basic(candidate, job_description)
 
-def score_candidates_enhanced(candidates: List[Dict[str, Any]], job_description: str, use_ai_for_top: bool = True) -> List[Dict[str, Any]]:
+    def score_candidates_with_ai_batch(self, candidates: List[Dict[str, Any]], job_description: str) -> List[Dict[str, Any]]:
+        """Score several candidates with one LLM request; the rubric and job description are sent once.
+
+        Results are aligned with the input. Candidates whose entry is missing or cannot be
+        parsed fall back to basic scoring individually.
+        """
+        if not candidates:
+            return []
+        if not self.use_ai:
+            return [self.score_candidate_basic(c, job_description) for c in candidates]
+
+        listing = [dict(id=f"c{i}", **self._candidate_info(c)) for i, c in enumerate(candidates)]
+        prompt = f"""
+        Score each candidate for the given job using this exact rubric:
+
+        {SCORING_RUBRIC}
+
+        Job Description: {job_description}
+        Candidates: {json.dumps(listing)}
+
+        Return ONLY a JSON array with one object per candidate, keeping each candidate's id:
+        [{{"id": "c0", "total_score": 8.5, "breakdown": {{"education": 9.0, "trajectory": 8.0, "company": 8.5, "experience": 9.0, "location": 10.0, "tenure": 7.0}}}}]
+        """
+
+        parsed, failure = {}, "unparseable"
+        try:
+            result = cached_completion(
+                self.groq_client,
+                model="llama3-8b-8192",
+                prompt=prompt,
+                temperature=0.1,
+                max_tokens=60 + 80 * len(candidates)
+            )
+            parsed = self._parse_batch_scores(result or "")
+        except Exception as e:
+            print(f"Batched AI scoring failed for {len(candidates)} candidates: {e}")
+            failure = describe_failure(e)
+
+        results = []
+        for i, candidate in enumerate(candidates):
+            try:
+                results.append(self._ai_scoring_result(parsed[f"c{i}"]))
+            except Exception:
+                record_degraded("ai_scoring", failure, candidate.get("linkedin_url"))
+                results.append(self.score_candidate_basic(candidate, job_description))
+        return results
+
+    @staticmethod
+    def _parse_batch_scores(result: str) -> Dict[str, Dict[str, Any]]:
+        """Map candidate id -> score object from a batched reply.
+
+        Reads the JSON array when it is well formed; otherwise salvages every complete
+        {"id": ..., ...} object it can find, so one bad entry does not sink the rest.
+        """
+        entries = []
+        array_start, array_end = result.find('['), result.rfind(']') + 1
+        if array_start != -1 and array_end > array_start:
+            try:
+                entries = json.loads(result[array_start:array_end])
+            except json.JSONDecodeError:
+                entries = []
+        if not isinstance(entries, list) or not entries:
+            entries = []
+            for match in BATCH_ENTRY_PATTERN.finditer(result):
+                try:
+                    entries.append(json.loads(match.group()))
+                except json.JSONDecodeError:
+                    continue
+        return {str(e["id"]): e for e in entries if isinstance(e, dict) and "id" in e}
+
+def score_candidates_enhanced(candidates: List[Dict[str, Any]], job_description: str, use_ai_for_top: bool = True,
+                              top_k: int = None, ai_top_n: int = None, ai_concurrency: int = None,
+                              ai_call_timeout: float = None, ai_deadline: float = None,
+                              ai_batch_size: int = None) -> List[Dict[str, Any]]:
     """
     Enhanced scoring function with performance optimization
     
     Args:
         candidates: List of candidate dictionaries
         job_description: Job description text
-        use_ai_for_top: Whether to use AI for top 5 candidates only (for performance)
+        use_ai_for_top: Whether to use AI for the top candidates only (for performance)
+        top_k: Only return the best top_k candidates (selected with a bounded heap, no full sort)
+        ai_top_n: How many top candidates get AI rescoring (default AI_RESCORE_TOP_N)
+        ai_concurrency: Maximum simultaneous AI rescoring calls (default AI_RESCORE_CONCURRENCY)
+        ai_call_timeout: Seconds one AI call may take before its basic score is kept
+        ai_deadline: Seconds after which all unfinished AI rescoring is dropped
+        ai_batch_size: Candidates packed into one batched scoring prompt (1 = one prompt each)
     """
     scorer = OptimizedScoring()
-    scored_candidates = []
+    job_profile = get_job_profile(job_description)
     
-    # Score all candidates with basic method first
-    for candidate in candidates:
-        scoring_result = scorer.score_candidate_basic(candidate, job_description)
-        
-        scored_candidate = {
-            "name": candidate["name"],
-            "linkedin_url": candidate["linkedin_url"],
-            "headline": candidate.get("headline", ""),
-            "score": scoring_result["score"],
-            "breakdown": scoring_result["breakdown"],
-            "reasoning": scoring_result.get("reasoning", {})
-        }
-        scored_candidates.append(scored_candidate)
-    
-    # Sort by score to identify top candidates
-    scored_candidates.sort(key=lambda x: x["score"], reverse=True)
+    # Score all candidates with basic method first, ranking them by score
+    with span("basic_scoring"):
+        if top_k is None:
+            ranked = [(scorer.score_candidate_entry(c, job_profile), c) for c in candidates]
+            ranked.sort(key=lambda pair: pair[0]["score"], reverse=True)
+        else:
+            ranked = scorer.top_k(candidates, job_profile, top_k)
+    scored_candidates = [scored for scored, _ in ranked]
     
-    # Use AI for top candidates if requested and available
+    # Use AI for top candidates if requested and available; calls that fail, time out
+    # or miss the deadline keep their basic score
     if use_ai_for_top and scorer.use_ai:
-        top_count = min(5, len(scored_candidates))
-        for i in range(top_count):
-            ai_result = scorer.score_candidate_with_ai(candidates[i], job_description)
-            scored_candidates[i].update({
+        top_n = AI_RESCORE_TOP_N if ai_top_n is None else ai_top_n
+        batch_size = max(1, ai_batch_size or AI_RESCORE_BATCH_SIZE)
+        top_candidates = [candidate for _, candidate in ranked[:top_n]]
+        # With batching, each concurrent call scores a chunk of candidates in one prompt
+        chunks = [top_candidates[i:i + batch_size] for i in range(0, len(top_candidates), batch_size)]
+        deadline = AI_RESCORE_DEADLINE if ai_deadline is None else ai_deadline
+        call_timeout = min(AI_RESCORE_CALL_TIMEOUT if ai_call_timeout is None else ai_call_timeout, deadline)
+        if deadline <= 0:
+            # No time left at all: keep every basic score without starting any call
+            for candidate in top_candidates:
+                record_degraded("ai_scoring", "deadline", candidate.get("linkedin_url"))
+            chunk_results = []
+        else:
+            with span("ai_rescoring"):
+                chunk_results = run_concurrently(
+                    lambda chunk: scorer.score_candidates_with_ai_batch(chunk, job_description) if len(chunk) > 1
+                    else [scorer.score_candidate_with_ai(chunk[0], job_description)],
+                    chunks,
+                    max_workers=ai_concurrency or AI_RESCORE_CONCURRENCY,
+                    call_timeout=call_timeout,
+                    deadline=deadline
+                )
+        ai_results = []
+        for chunk, results in zip(chunks, chunk_results):
+            if results is None:
+                for candidate in chunk:
+                    record_degraded("ai_scoring", "timeout", candidate.get("linkedin_url"))
+                results = [None] * len(chunk)
+            ai_results.extend(results)
+        for scored, ai_result in zip(scored_candidates, ai_results):
+            if ai_result is None:
+                continue
+            scored.update({
                 "score": ai_result["score"],
                 "breakdown": ai_result["breakdown"],
                 "reasoning": ai_result.get("reasoning", {})
@@ -342,6 +556,20 @@ def score_candidates_enhanced(candidates: List[Dict[str, Any]], job_description:
     
     return scored_candidates
 
-def score_candidates_fast(candidates: List[Dict[str, Any]], job_description: str) -> List[Dict[str, Any]]:
-    """Fast scoring without AI for performance"""
-    return score_candidates_enhanced(candidates, job_description, use_ai_for_top=False) 
\ No newline at end of file
+def score_candidates_fast(candidates: List[Dict[str, Any]], job_description: str, top_k: int = None,
+                          weights: Dict[str, float] = None) -> List[Dict[str, Any]]:
+    """Fast scoring without AI for performance (vectorized batch engine).
+
+    Job-independent features are cached per candidate set, so re-scoring the same candidates
+    with another description or weights only recomputes the experience dimension.
+    """
+    from app.core.batch_scoring import score_candidates_batch
+    with span("basic_scoring"):
+        return score_candidates_batch(candidates, job_description, top_k=top_k, weights=weights)
+
+def score_jobs_fast(candidates: List[Dict[str, Any]], job_descriptions: List[str], top_k: int = None,
+                    weights: Dict[str, float] = None) -> List[List[Dict[str, Any]]]:
+    """Fast scoring of one candidate pool against several jobs; candidate features are extracted once"""
+    from app.core.batch_scoring import score_jobs_batch
+    with span("basic_scoring"):
+        return score_jobs_batch(candidates, job_descriptions, top_k=top_k, weights=weights)
@@ -0,0 +1,10 @@
+import os
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Boolean setting from the environment: "1", "true" and "yes" (any case) turn it on,
+    any other value turns it off, and default applies when the variable is unset"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes")
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_JOB_STORE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '.cache', 'jobs.sqlite3'))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+UNFINISHED = (QUEUED, RUNNING)
+
+
+def _new_job(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "params": params,
+        "status": QUEUED,
+        "stages": {},
+        "result": None,
+        "error": None,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None
+    }
+
+
+class InMemoryJobStore:
+    """Job records kept in a dict; lost on restart"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]):
+        with self._lock:
+            self._jobs[job["id"]] = json.loads(json.dumps(job))
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(json.loads(json.dumps(fields)))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [json.loads(json.dumps(j)) for j in self._jobs.values() if j["status"] in UNFINISHED]
+
+
+class SQLiteJobStore:
+    """Job records persisted in SQLite, so queued and interrupted jobs survive a restart"""
+
+    JSON_FIELDS = ("params", "stages", "result")
+    COLUMNS = ("id", "kind", "params", "status", "stages", "result", "error", "created_at", "started_at", "finished_at")
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('JOB_STORE_PATH', DEFAULT_JOB_STORE_PATH)
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT, params TEXT, status TEXT, stages TEXT, result TEXT, error TEXT,"
+            " created_at REAL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        self._conn.commit()
+
+    def _encode(self, field: str, value: Any) -> Any:
+        return json.dumps(value) if field in self.JSON_FIELDS else value
+
+    def _decode(self, row) -> Dict[str, Any]:
+        job = dict(zip(self.COLUMNS, row))
+        for field in self.JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+
+    def create(self, job: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                [self._encode(c, job[c]) for c in self.COLUMNS]
+            )
+            self._conn.commit()
+
+    def update(self, job_id: str, **fields):
+        if not fields:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                [self._encode(k, v) for k, v in fields.items()] + [job_id]
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status IN (?, ?) ORDER BY created_at", UNFINISHED
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+
+def job_store_from_env():
+    """JOB_STORE=memory (default) or sqlite"""
+    backend = os.getenv('JOB_STORE', 'memory').lower()
+    if backend == 'sqlite':
+        return SQLiteJobStore()
+    if backend != 'memory':
+        print(f"Warning: unknown JOB_STORE '{backend}'. Using in-memory job store.")
+    return InMemoryJobStore()
+
+
+class JobQueue:
+    """Runs registered job kinds on an in-process worker pool, recording status and per-stage progress"""
+
+    def __init__(self, store=None, max_workers: int = None):
+        self.store = store or job_store_from_env()
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', 4))
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler: Callable[..., Any]):
+        """handler(params, report) -> JSON-serializable result; report(stage, status, **info) records progress"""
+        self._handlers[kind] = handler
+
+    def start(self):
+        """Start the workers and re-queue jobs left queued or running by a previous process"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        for job in self.store.list_unfinished():
+            self.store.update(job["id"], status=QUEUED, started_at=None)
+            self._executor.submit(self._run, job["id"])
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._executor is None:
+            self.start()
+        job = _new_job(kind, params)
+        self.store.create(job)
+        self._executor.submit(self._run, job["id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in UNFINISHED:
+            return
+        stages = job["stages"] or {}
+
+        def report(stage: str, status: str, **info):
+            stages[stage] = dict(stages.get(stage, {}), status=status, updated_at=time.time(), **info)
+            self.store.update(job_id, stages=stages)
+
+        self.store.update(job_id, status=RUNNING, started_at=time.time())
+        try:
+            result = self._handlers[job["kind"]](job["params"], report)
+            self.store.update(job_id, status=SUCCEEDED, result=result, finished_at=time.time())
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self.store.update(job_id, status=FAILED, error=str(e), finished_at=time.time())
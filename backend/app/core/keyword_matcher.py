@@ -0,0 +1,85 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a keyword dictionary.
+
+    Each keyword is registered under a category with a rank. One left-to-right pass
+    over a text finds every (possibly overlapping) substring occurrence, so the
+    result is identical to testing `keyword in text` for each keyword separately.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, str, int]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own: List[List[Tuple[str, str, int]]] = [[]]
+        self._out: List[List[Tuple[str, str, int]]] = [[]]
+        self._built = False
+        for keyword, category, rank in patterns:
+            self.add(keyword, category, rank)
+        self.build()
+
+    def add(self, keyword: str, category: str, rank: int = 0):
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+            state = nxt
+        self._own[state].append((keyword, category, rank))
+        self._built = False
+
+    def build(self):
+        """Compute failure links and merge outputs along them (breadth-first)"""
+        self._out = [list(own) for own in self._own]
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            current = queue.popleft()
+            for ch, nxt in self._goto[current].items():
+                queue.append(nxt)
+                fallback = self._fail[current]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+
+    def _iter_outputs(self, text: str):
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                yield out[state]
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """Categories present in text, each mapped to the lowest rank among its hits"""
+        hits: Dict[str, int] = {}
+        for outputs in self._iter_outputs(text):
+            for _, category, rank in outputs:
+                if rank < hits.get(category, rank + 1):
+                    hits[category] = rank
+        return hits
+
+    def keywords_in(self, text: str) -> Set[str]:
+        """Distinct keywords occurring in text"""
+        found = set()
+        for outputs in self._iter_outputs(text):
+            for keyword, _, _ in outputs:
+                found.add(keyword)
+        return found
@@ -0,0 +1,170 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+from app.core.env import env_flag
+from app.core.resilience import get_guard
+from app.core.metrics import span, GROQ_CALL_SECONDS, GROQ_TOKENS, LLM_CACHE_REQUESTS
+
+load_dotenv()
+
+DEFAULT_CACHE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '.cache', 'llm_cache.sqlite3'))
+
+
+class LLMCache:
+    """On-disk cache of LLM completions keyed by model + normalized prompt + temperature.
+
+    Entries expire after ttl_seconds; once the table holds more than max_entries rows
+    the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: float = None, max_entries: int = None, enabled: bool = None):
+        self.path = path or os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.ttl_seconds = float(ttl_seconds if ttl_seconds is not None else os.getenv('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+        self.max_entries = int(max_entries if max_entries is not None else os.getenv('LLM_CACHE_MAX_ENTRIES', 50000))
+        self.enabled = enabled if enabled is not None else not env_flag('LLM_CACHE_DISABLED')
+        self.bypass = env_flag('LLM_CACHE_BYPASS')
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        if self.enabled:
+            try:
+                self._open()
+            except (OSError, sqlite3.Error) as e:
+                # A cache that cannot be opened must not cost the completions themselves
+                print(f"Warning: LLM cache unavailable at {self.path} ({e}). Caching disabled.")
+                self._conn = None
+                self.enabled = False
+
+    def _open(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT,"
+            " created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float) -> str:
+        normalized = " ".join(prompt.split())
+        raw = f"{model}\x00{float(temperature):.3f}\x00{normalized}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on a miss or an expired entry"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, model: str, response: str):
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if size > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (size - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, object]:
+        size = 0
+        if self.enabled:
+            with self._lock:
+                size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "enabled": self.enabled,
+            "bypass": self.bypass,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": size
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide LLM cache shared by every Groq call site"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
+
+
+def cached_completion(client, model: str, prompt: str, temperature: float, max_tokens: int,
+                      bypass: bool = False, guard=None, cache: LLMCache = None) -> Optional[str]:
+    """Return the completion text for a single-message prompt, served from the cache when possible.
+
+    With bypass (or LLM_CACHE_BYPASS) the lookup is skipped but the fresh response is still stored.
+    Misses go through the Groq provider guard (rate limit, retries, circuit breaker) unless
+    another guard is given.
+    """
+    cache = cache or get_llm_cache()
+    key = cache.make_key(model, prompt, temperature)
+    started = time.perf_counter()
+    outcome = "bypass" if (bypass or cache.bypass) else "miss"
+    if outcome == "miss":
+        cached = cache.get(key)
+        if cached is not None:
+            LLM_CACHE_REQUESTS.inc(model=model, result="hit")
+            GROQ_CALL_SECONDS.observe(time.perf_counter() - started, model=model, cache="hit")
+            return cached
+    LLM_CACHE_REQUESTS.inc(model=model, result=outcome)
+
+    guard = guard or get_guard("groq")
+    with span("groq_call"):
+        response = guard.call(
+            client.chat.completions.create,
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    GROQ_CALL_SECONDS.observe(time.perf_counter() - started, model=model, cache=outcome)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        GROQ_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+        GROQ_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+    result = response.choices[0].message.content
+    if result:
+        cache.set(key, model, result)
+    return result
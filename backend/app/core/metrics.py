@@ -0,0 +1,150 @@
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> LabelValues:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelValues, extra: Tuple[str, str] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered like prometheus_client's"""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # per-bucket counts + [+Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', repr(float(bound))))} {_format_value(cumulative)}")
+                cumulative += series[len(self.buckets)]
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {_format_value(cumulative)}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]!r}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(cumulative)}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("pipeline_stage_duration_seconds", "Time spent in each pipeline stage")
+GROQ_CALL_SECONDS = Histogram("groq_call_duration_seconds", "Groq completion latency by model and cache result")
+GROQ_TOKENS = Counter("groq_tokens_total", "Tokens used by Groq completions, by model and kind (prompt/completion)")
+LLM_CACHE_REQUESTS = Counter("llm_cache_requests_total", "LLM cache lookups by model and result (hit/miss/bypass)")
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "API request latency by method, route and status")
+
+METRICS = [STAGE_SECONDS, GROQ_CALL_SECONDS, GROQ_TOKENS, LLM_CACHE_REQUESTS, HTTP_REQUEST_SECONDS]
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Spans finished while handling the current request (None = not collecting)
+_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar("timings", default=None)
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block: observed into the stage histogram and added to the current request's timings"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+@contextmanager
+def collect_timings(timings: List[Tuple[str, float]] = None):
+    """Collect the spans finished in this context (and in threads started with a copy of it)"""
+    timings = [] if timings is None else timings
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def summarize_timings(timings: List[Tuple[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Per stage: number of spans, their total and their maximum in milliseconds.
+
+    Spans of one stage can overlap (e.g. concurrent Groq calls), so a stage's total can
+    exceed the request's wall time.
+    """
+    summary: Dict[str, Dict[str, float]] = {}
+    for stage, elapsed in timings:
+        entry = summary.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += elapsed * 1000
+        entry["max_ms"] = max(entry["max_ms"], elapsed * 1000)
+    for entry in summary.values():
+        entry["total_ms"] = round(entry["total_ms"], 1)
+        entry["max_ms"] = round(entry["max_ms"], 1)
+    return summary
+
+
+def server_timing(summary: Dict[str, Dict[str, float]]) -> str:
+    """Server-Timing header value (total milliseconds per stage)"""
+    return ", ".join(f'{stage};dur={entry["total_ms"]};desc="{entry["count"]}x"' for stage, entry in summary.items())
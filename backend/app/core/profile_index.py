@@ -0,0 +1,213 @@
+import re
+import math
+import heapq
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from app.core.profile_store import ProfileStore, get_profile_store, normalize_linkedin_url
+
+# Dictionaries of the basic (non-AI) search-term extraction; multi-word entries are also
+# indexed as single phrase terms, so "mountain view" matches as a phrase and not only as two words
+BASIC_SEARCH_TERMS = {
+    "job_titles": ["ML Engineer", "LLM Researcher", "Software Engineer", "AI Scientist", "Backend Engineer"],
+    "companies": ["Windsurf", "Codeium"],
+    "locations": ["Mountain View", "California", "Bay Area"],
+    "techs": ["Python", "LLM", "AI", "Transformer", "Deep Learning"]
+}
+
+PHRASES = sorted({term.lower() for terms in BASIC_SEARCH_TERMS.values() for term in terms if " " in term})
+
+# Same token shape as required skills in scoring (c++, c#, node.js), minus trailing dots
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9\+\#\.]*')
+
+INDEXED_FIELDS = ("headline", "title", "skills", "companies", "education", "location")
+
+# Filler words of job descriptions; left out of job queries and embeddings
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to we with you your will who "
+    "experience years year strong looking role team work working join plus".split()
+)
+
+
+def extract_basic_terms(text: str) -> List[str]:
+    """BASIC_SEARCH_TERMS entries mentioned in text (case-insensitive), in dictionary order"""
+    lower = text.lower()
+    return [term for terms in BASIC_SEARCH_TERMS.values() for term in terms if term.lower() in lower]
+
+
+def analyze(text: str) -> List[str]:
+    """Index terms of a text: its lowercased word tokens plus the BASIC_SEARCH_TERMS phrases it contains"""
+    lower = text.lower()
+    terms = [token.rstrip(".") for token in TOKEN_PATTERN.findall(lower)]
+    terms.extend(phrase for phrase in PHRASES if phrase in lower)
+    return terms
+
+
+def job_terms(job_description: str) -> List[str]:
+    """Terms to look a job description up by: its basic search terms (phrases included) and
+    its skill tokens, without stopwords or bare numbers"""
+    tokens = [token.rstrip(".") for token in TOKEN_PATTERN.findall(job_description.lower())]
+    words = set(tokens)
+    terms = []
+    for basic in extract_basic_terms(job_description):
+        basic_terms = analyze(basic)
+        # extract_basic_terms matches substrings ("ai" in "mountain"); keep whole words only
+        if all(term in words for term in basic_terms if " " not in term):
+            terms.extend(basic_terms)
+    terms.extend(tokens)
+    return [term for term in dict.fromkeys(terms) if term not in STOPWORDS and not term.isdigit()]
+
+
+def profile_text(candidate: Dict[str, Any]) -> str:
+    parts = []
+    for field in INDEXED_FIELDS:
+        value = candidate.get(field) or ""
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        else:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+class ProfileIndex:
+    """In-memory inverted index over stored candidate profiles with BM25-ranked boolean (any/all) queries.
+
+    Documents are keyed by normalized LinkedIn URL; adding a profile that is already
+    indexed replaces it, so the index can be kept current with add() as profiles are
+    sourced and enriched.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {doc id: term frequency}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._ids: Dict[str, int] = {}
+        self._next_id = 0
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_store(cls, store: ProfileStore, **kwargs) -> "ProfileIndex":
+        index = cls(**kwargs)
+        index.add_many(store.iter_profiles())
+        return index
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, candidate: Dict[str, Any]):
+        self.add_many([candidate])
+
+    def add_many(self, candidates: Iterable[Dict[str, Any]]):
+        with self._lock:
+            for candidate in candidates:
+                key = normalize_linkedin_url(candidate["linkedin_url"])
+                doc_id = self._ids.get(key)
+                if doc_id is not None:
+                    self._remove(doc_id)
+                else:
+                    doc_id = self._ids[key] = self._next_id
+                    self._next_id += 1
+                terms = Counter(analyze(profile_text(candidate)))
+                for term, frequency in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = frequency
+                length = sum(terms.values())
+                self._doc_terms[doc_id] = terms
+                self._doc_lengths[doc_id] = length
+                self._total_length += length
+                self._docs[doc_id] = dict(candidate)
+
+    def get_many(self, linkedin_urls: Iterable[str]) -> List[Dict[str, Any]]:
+        """Indexed profiles for these URLs, in the same order; unknown URLs are skipped"""
+        with self._lock:
+            ids = (self._ids.get(normalize_linkedin_url(url)) for url in linkedin_urls)
+            return [dict(self._docs[doc_id]) for doc_id in ids if doc_id is not None]
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(doc) for doc in self._docs.values()]
+
+    def _remove(self, doc_id: int):
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+        self._docs.pop(doc_id, None)
+
+    def search(self, query: Union[str, Sequence[str]], limit: int = 10, match: str = "any", exclude: Iterable[str] = (),
+               min_score: float = 0.0, min_match: float = 0.0) -> List[Tuple[float, Dict[str, Any]]]:
+        """(BM25 score, candidate) pairs, best first (ties in insertion order), for the query's analyzed terms
+        (query is text, or a list of terms that are used as they are, e.g. from job_terms()).
+
+        match "any" considers every profile containing at least one query term (OR); "all"
+        only those containing every term (AND). exclude holds LinkedIn URLs to leave out;
+        hits scoring min_score or less, or containing less than the min_match fraction of the
+        query terms, are dropped.
+        """
+        if match not in ("any", "all"):
+            raise ValueError(f"Unknown match mode: {match}")
+        terms = list(dict.fromkeys(analyze(query) if isinstance(query, str) else query))
+        excluded = {normalize_linkedin_url(url) for url in exclude}
+        with self._lock:
+            if not self._docs or not terms:
+                return []
+            postings = [self._postings.get(term, {}) for term in terms]
+            if match == "all":
+                if not all(postings):
+                    return []
+                matches = set.intersection(*(set(p) for p in postings))
+            elif min_match > 0:
+                needed = math.ceil(min_match * len(terms))
+                counts = Counter(doc_id for term_postings in postings for doc_id in term_postings)
+                matches = {doc_id for doc_id, count in counts.items() if count >= needed}
+            else:
+                matches = set().union(*postings)
+            scores = self._bm25(postings, matches)
+            excluded_ids = {self._ids[key] for key in excluded if key in self._ids}
+            ranked = heapq.nsmallest(
+                max(0, limit),
+                ((score, doc_id) for doc_id, score in scores.items() if doc_id not in excluded_ids and score > min_score),
+                key=lambda pair: (-pair[0], pair[1])
+            )
+            return [(round(score, 4), dict(self._docs[doc_id])) for score, doc_id in ranked]
+
+    def _bm25(self, postings: List[Dict[int, int]], matches: set) -> Dict[int, float]:
+        count = len(self._docs)
+        average_length = (self._total_length / count if count else 0.0) or 1.0
+        k1, b = self.k1, self.b
+        # Length normalization of each matching document, computed once for all query terms
+        norms = {doc_id: k1 * (1 - b + b * self._doc_lengths[doc_id] / average_length) for doc_id in matches}
+        scores = dict.fromkeys(matches, 0.0)
+        for term_postings in postings:
+            if not term_postings:
+                continue
+            idf = math.log(1 + (count - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for doc_id, frequency in term_postings.items():
+                norm = norms.get(doc_id)
+                if norm is not None:
+                    scores[doc_id] += idf * frequency * (k1 + 1) / (frequency + norm)
+        return scores
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"profiles": len(self._docs), "terms": len(self._postings)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_profile_index(store: Optional[ProfileStore] = None) -> ProfileIndex:
+    """Process-wide index over the profile store, built from it on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ProfileIndex.from_store(store or get_profile_store())
+    return _index
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Any, Iterator, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_STORE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '.cache', 'profiles.sqlite3'))
+
+
+def normalize_linkedin_url(linkedin_url: str) -> str:
+    """Canonical profile key: no scheme, country subdomain, query string or trailing slash"""
+    url = linkedin_url.strip().lower().split('#')[0].split('?')[0]
+    if '://' in url:
+        url = url.split('://', 1)[1]
+    host, _, path = url.partition('/')
+    if host.endswith('linkedin.com'):
+        host = 'linkedin.com'
+    return f"{host}/{path.rstrip('/')}"
+
+
+class ProfileStore:
+    """SQLite store of sourced candidates and their enrichment, keyed by normalized LinkedIn URL"""
+
+    def __init__(self, path: str = None, stale_after_seconds: float = None):
+        self.path = path or os.getenv('PROFILE_STORE_PATH', DEFAULT_STORE_PATH)
+        self.stale_after_seconds = float(
+            stale_after_seconds if stale_after_seconds is not None
+            else os.getenv('PROFILE_STALE_AFTER_SECONDS', 7 * 24 * 3600)
+        )
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " url_key TEXT PRIMARY KEY, linkedin_url TEXT, name TEXT, headline TEXT, title TEXT,"
+            " enrichment TEXT, enrichment_source TEXT,"
+            " first_seen REAL, last_seen REAL, enriched_at REAL)"
+        )
+        self._conn.commit()
+
+    def _row_to_record(self, row) -> Dict[str, Any]:
+        return {
+            "url_key": row[0],
+            "linkedin_url": row[1],
+            "name": row[2],
+            "headline": row[3],
+            "title": row[4],
+            "enrichment": json.loads(row[5]) if row[5] else None,
+            "enrichment_source": row[6],
+            "first_seen": row[7],
+            "last_seen": row[8],
+            "enriched_at": row[9]
+        }
+
+    def get_many(self, linkedin_urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up stored profiles; the result is keyed by normalized URL"""
+        keys = list({normalize_linkedin_url(u) for u in linkedin_urls})
+        records = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT * FROM profiles WHERE url_key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    records[row[0]] = self._row_to_record(row)
+        return records
+
+    def is_fresh(self, record: Optional[Dict[str, Any]], require_ai: bool = False) -> bool:
+        """Whether a stored enrichment can be reused instead of analysing the profile again"""
+        if not record or not record["enrichment"] or record["enriched_at"] is None:
+            return False
+        if require_ai and record["enrichment_source"] != "ai":
+            return False
+        return time.time() - record["enriched_at"] <= self.stale_after_seconds
+
+    def upsert_profiles(self, candidates: List[Dict[str, Any]]):
+        """Record the CSE snippet of each candidate, keeping first_seen and any stored enrichment"""
+        now = time.time()
+        rows = [
+            (normalize_linkedin_url(c["linkedin_url"]), c["linkedin_url"], c.get("name", ""),
+             c.get("headline", ""), c.get("title", ""), now, now)
+            for c in candidates
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO profiles (url_key, linkedin_url, name, headline, title, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url_key) DO UPDATE SET linkedin_url = excluded.linkedin_url, name = excluded.name,"
+                " headline = excluded.headline, title = excluded.title, last_seen = excluded.last_seen",
+                rows
+            )
+            self._conn.commit()
+
+    def save_enrichment(self, linkedin_url: str, enrichment: Dict[str, Any], source: str):
+        """Store the analysis of a profile; source is "ai" or "basic" """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE profiles SET enrichment = ?, enrichment_source = ?, enriched_at = ? WHERE url_key = ?",
+                (json.dumps(enrichment), source, time.time(), normalize_linkedin_url(linkedin_url))
+            )
+            self._conn.commit()
+
+    def iter_profiles(self) -> Iterator[Dict[str, Any]]:
+        """Yield every stored profile as a candidate dict (snippet fields merged with enrichment)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM profiles ORDER BY first_seen").fetchall()
+        for row in rows:
+            record = self._row_to_record(row)
+            candidate = {
+                "name": record["name"],
+                "linkedin_url": record["linkedin_url"],
+                "headline": record["headline"],
+                "title": record["title"]
+            }
+            candidate.update(record["enrichment"] or {})
+            yield candidate
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """Process-wide profile store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore()
+    return _store
@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace outbound API calls"""
+
+    def __init__(self, rate: float, capacity: float = None, min_rate: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        # throttle() lowers the rate towards min_rate; recover() raises it back to max_rate
+        self.max_rate = self.rate
+        self.min_rate = float(min_rate if min_rate is not None else self.rate / 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait before retrying"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate <= 0:
+                return 0.0
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: float = None) -> bool:
+        """Block until tokens are available (or the timeout expires)"""
+        if self.rate <= 0 and time.monotonic() >= self._paused_until:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def throttle(self, pause: float = 0.0, factor: float = 0.5):
+        """Back off after a rate-limit response: cut the rate and hold every caller for pause seconds"""
+        with self._lock:
+            if self.rate > 0:
+                self._refill()
+                self.rate = max(self.min_rate, self.rate * factor)
+                self._tokens = min(self._tokens, 0.0)
+            if pause > 0:
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def recover(self, fraction: float = 0.05):
+        """Raise a throttled rate back towards max_rate by a fraction of it after a successful call"""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate * fraction)
+
+
+def bucket_from_env(prefix: str, default_rate: float, default_burst: float = None) -> TokenBucket:
+    """Build a token bucket from <PREFIX>_REQUESTS_PER_SECOND / <PREFIX>_BURST env vars"""
+    rate = float(os.getenv(f"{prefix}_REQUESTS_PER_SECOND", default_rate))
+    burst = os.getenv(f"{prefix}_BURST")
+    return TokenBucket(rate, float(burst) if burst else default_burst)
@@ -0,0 +1,287 @@
+import os
+import time
+import random
+import threading
+import contextvars
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional
+import groq
+import httpx
+import httplib2
+from dotenv import load_dotenv
+
+from app.core.rate_limit import TokenBucket, bucket_from_env
+
+load_dotenv()
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# Google reports per-user and daily quota exhaustion as 403 with one of these reasons
+QUOTA_REASONS = ("ratelimitexceeded", "userratelimitexceeded", "quotaexceeded", "dailylimitexceeded")
+TRANSPORT_ERRORS = (OSError, httpx.TransportError, groq.APIConnectionError, httplib2.HttpLib2Error)
+
+# Default requests/second per provider when <PREFIX>_REQUESTS_PER_SECOND is unset
+DEFAULT_RATES = {"groq": 10, "cse": 10}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+
+
+def error_status(exc: Exception) -> Optional[int]:
+    """HTTP status of a Groq (APIStatusError) or Google API (HttpError) exception"""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "resp", None), "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Seconds requested by the Retry-After header of a failed response, if any"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        headers = getattr(exc, "resp", None)  # httplib2 responses are dicts with lower-case keys
+    try:
+        value = headers.get("retry-after") if headers is not None else None
+    except Exception:
+        return None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(exc: Exception, status: Optional[int] = None) -> bool:
+    status = error_status(exc) if status is None else status
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    content = getattr(exc, "content", b"") or b""
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", "replace")
+    text = f"{exc} {content}".lower().replace("_", "")
+    return any(reason in text for reason in QUOTA_REASONS)
+
+
+def is_retryable(exc: Exception, status: Optional[int] = None) -> bool:
+    status = error_status(exc) if status is None else status
+    if status is not None:
+        return status in RETRYABLE_STATUSES or is_rate_limited(exc, status)
+    return isinstance(exc, TRANSPORT_ERRORS)
+
+
+def describe_failure(exc: Exception) -> str:
+    """Short reason code for a degraded result"""
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open"
+    status = error_status(exc)
+    if is_rate_limited(exc, status):
+        return "rate_limited"
+    if isinstance(exc, (TimeoutError, httpx.TimeoutException, groq.APITimeoutError)):
+        return "timeout"
+    if status is not None:
+        return f"http_{status}"
+    if isinstance(exc, TRANSPORT_ERRORS):
+        return "unreachable"
+    return "error"
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failed calls and rejects calls for reset_after seconds.
+
+    Once that time has passed, one probe call is let through (half-open). Its success closes
+    the circuit; its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_after = reset_after
+        self.failures = 0
+        self._opened_until = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_until is None:
+                return "closed"
+            return "half_open" if time.monotonic() >= self._opened_until else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_until is None:
+                return True
+            if time.monotonic() < self._opened_until or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_until = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self._opened_until = time.monotonic() + self.reset_after
+            self._probing = False
+
+    def trip(self, seconds: float = None):
+        """Open the circuit right away, e.g. when a quota resets far in the future"""
+        with self._lock:
+            self._opened_until = time.monotonic() + (self.reset_after if seconds is None else seconds)
+            self._probing = False
+
+
+class ProviderGuard:
+    """Rate limiting, retries with backoff and a circuit breaker around calls to one upstream API.
+
+    Retryable failures (429/quota, 5xx, timeouts, connection errors) are retried up to
+    max_retries times, waiting for Retry-After when the provider sends it and for an
+    exponential backoff with full jitter otherwise. A rate-limit response also throttles
+    the shared token bucket, so every caller slows down, not just the one that was refused.
+    Only a call that still fails after its retries counts towards opening the circuit.
+    """
+
+    def __init__(self, name: str, limiter: TokenBucket, breaker: CircuitBreaker = None, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, max_retry_after: float = 30.0):
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open after repeated failures")
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                status = error_status(e)
+                if not is_retryable(e, status):
+                    # The provider answered; a bad request says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                retry_after = retry_after_seconds(e)
+                if is_rate_limited(e, status):
+                    self.limiter.throttle(pause=min(retry_after or 0.0, self.max_retry_after))
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    print(f"{self.name} asked to retry after {retry_after:.0f}s; failing fast until then")
+                    self.breaker.trip(retry_after)
+                    raise
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = retry_after if retry_after is not None else self.backoff(attempt)
+                print(f"{self.name} call failed ({describe_failure(e)}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                attempt += 1
+                time.sleep(delay)
+                if self.breaker.state == "open":
+                    # Other calls gave up on the provider while this one was waiting
+                    self.breaker.record_failure()
+                    raise CircuitOpenError(f"{self.name} circuit opened while retrying") from e
+                continue
+            self.breaker.record_success()
+            self.limiter.recover()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "requests_per_second": self.limiter.rate
+        }
+
+
+def guard_from_env(name: str) -> ProviderGuard:
+    """Build a guard from <NAME>_REQUESTS_PER_SECOND, _BURST, _MAX_RETRIES, _BACKOFF_BASE_SECONDS,
+    _BACKOFF_MAX_SECONDS, _MAX_RETRY_AFTER_SECONDS, _BREAKER_THRESHOLD and _BREAKER_RESET_SECONDS"""
+    prefix = name.upper()
+    return ProviderGuard(
+        name,
+        limiter=bucket_from_env(prefix, default_rate=DEFAULT_RATES.get(name, 10)),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv(f"{prefix}_BREAKER_THRESHOLD", 5)),
+            reset_after=float(os.getenv(f"{prefix}_BREAKER_RESET_SECONDS", 30))
+        ),
+        max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", 3)),
+        backoff_base=float(os.getenv(f"{prefix}_BACKOFF_BASE_SECONDS", 0.5)),
+        backoff_max=float(os.getenv(f"{prefix}_BACKOFF_MAX_SECONDS", 8)),
+        max_retry_after=float(os.getenv(f"{prefix}_MAX_RETRY_AFTER_SECONDS", 30))
+    )
+
+
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(name: str) -> ProviderGuard:
+    """Process-wide guard for a provider ("groq" or "cse"), shared by every call site"""
+    guard = _guards.get(name)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(name)
+            if guard is None:
+                guard = _guards[name] = guard_from_env(name)
+    return guard
+
+
+def guard_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: guard.stats() for name, guard in list(_guards.items())}
+
+
+# Degraded results recorded by the code handling the current request (None = not collecting)
+_degradations: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar("degradations", default=None)
+
+
+def record_degraded(stage: str, reason: str, item: str = None):
+    """Note that a result of this stage fell back (to basic scoring, a template, static data...)"""
+    events = _degradations.get()
+    if events is not None:
+        events.append({"stage": stage, "reason": reason, "item": item})
+
+
+@contextmanager
+def collect_degradations(events: List[Dict[str, Any]] = None):
+    """Collect record_degraded() calls made in this context (and in threads started with a copy of it)"""
+    events = [] if events is None else events
+    token = _degradations.set(events)
+    try:
+        yield events
+    finally:
+        _degradations.reset(token)
+
+
+def summarize_degradations(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One entry per degraded stage: how many results fell back, why, and which ones"""
+    summary: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        entry = summary.setdefault(event["stage"], {"stage": event["stage"], "count": 0, "reasons": [], "items": []})
+        entry["count"] += 1
+        if event["reason"] not in entry["reasons"]:
+            entry["reasons"].append(event["reason"])
+        if event["item"] is not None:
+            entry["items"].append(event["item"])
+    return list(summary.values())
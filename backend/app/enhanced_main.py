@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional
+import heapq
+import time
+import json
 import sys
 import os
 
@@ -11,10 +15,31 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from groq_agent import EnhancedLinkedInSourcingAgent
-from app.core.enhanced_scoring import score_candidates_enhanced, score_candidates_fast
-from app.core.enhanced_outreach import generate_outreach_enhanced
+from app.core.enhanced_scoring import score_candidates_enhanced, score_candidates_fast, score_jobs_fast
+from app.core.enhanced_outreach import generate_outreach_enhanced, iter_outreach_enhanced
+from app.core.llm_cache import get_llm_cache
+from app.core.concurrency import run_blocking, shutdown_pipeline_executor, Budget, SingleFlight, request_key, COALESCE_REQUESTS
+from app.core.jobs import JobQueue
+from app.core.clients import shutdown_clients
+from app.core.resilience import collect_degradations, summarize_degradations, guard_stats
+from app.core.metrics import span, collect_timings, summarize_timings, server_timing, render_prometheus, HTTP_REQUEST_SECONDS
+from app.core.batch_scoring import resolve_weights, get_batch_cache
+from app.core.embeddings import save_embedding_index, SEMANTIC_PREFILTER_SIZE
 
-app = FastAPI(title="Enhanced LinkedIn Sourcing Agent API", version="2.0.0")
+job_queue = JobQueue()
+# Concurrent identical search/scoring/outreach/pipeline calls share one execution
+in_flight = SingleFlight(COALESCE_REQUESTS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue.start()
+    yield
+    job_queue.shutdown()
+    shutdown_pipeline_executor()
+    shutdown_clients()
+    save_embedding_index()
+
+app = FastAPI(title="Enhanced LinkedIn Sourcing Agent API", version="2.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -25,6 +50,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep the series count bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method,
+                                     route=getattr(route, "path", "unmatched"), status=status)
+
 # Mount static files
 frontend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'frontend'))
 
@@ -53,7 +92,7 @@ class ScoredCandidate(BaseModel):
     linkedin_url: str
     headline: str
     score: float
-    breakdown: Dict[str, int]
+    breakdown: Dict[str, float]
     reasoning: Dict[str, str] = {}
     education: List[str] = []
     companies: List[str] = []
@@ -63,6 +102,25 @@ class ScoredCandidate(BaseModel):
     role_level: str = ""
     industry: str = ""
 
+class JobRanking(BaseModel):
+    description: str
+    candidates: List[ScoredCandidate]
+
+class ProfileQuery(BaseModel):
+    query: str
+    limit: int = 20
+    match: str = "any"
+
+class ProfileMatchQuery(BaseModel):
+    description: str
+    top_k: int = 10
+    prefilter: Optional[int] = None
+    weights: Optional[Dict[str, float]] = None
+
+class ProfileHit(BaseModel):
+    score: float
+    candidate: CandidateResponse
+
 class OutreachMessage(BaseModel):
     candidate: str
     message: str
@@ -80,88 +138,317 @@ async def serve_frontend():
     return FileResponse(index_path)
 
 
+def _collecting(degraded, timings, fn, *args, **kwargs):
+    with collect_degradations(degraded), collect_timings(timings):
+        return fn(*args, **kwargs)
+
+async def _run_collected(fn, *args, **kwargs):
+    degraded, timings = [], []
+    result = await run_blocking(_collecting, degraded, timings, fn, *args, **kwargs)
+    return result, degraded, timings
+
+async def run_reporting(response: Response, fn, *args, coalesce_key: str = None, **kwargs):
+    """run_blocking that reports stage timings in Server-Timing and fallbacks in X-Degraded.
+
+    With coalesce_key, a call made while an identical one (same key) is still running
+    waits for that one's result instead of running again, and is marked X-Coalesced.
+    """
+    if coalesce_key is None:
+        result, degraded, timings = await _run_collected(fn, *args, **kwargs)
+    else:
+        (result, degraded, timings), shared = await in_flight.do(coalesce_key, _run_collected, fn, *args, **kwargs)
+        if shared:
+            response.headers["X-Coalesced"] = "true"
+    if timings:
+        response.headers["Server-Timing"] = server_timing(summarize_timings(timings))
+    if degraded:
+        response.headers["X-Degraded"] = ",".join(entry["stage"] for entry in summarize_degradations(degraded))
+    return result
+
 @app.post("/search", response_model=List[CandidateResponse])
-async def search_candidates(request: Request):
+async def search_candidates(request: Request, response: Response):
     data = await request.json()
     job_description = data.get("description", "")
     profile_count = int(data.get("profile_count", 10))
     try:
-        candidates = agent.search_linkedin(job_description, use_ai_analysis=True, num_results=profile_count)
+        candidates = await run_reporting(response, agent.search_linkedin, job_description, use_ai_analysis=True, num_results=profile_count,
+                                         local_first=data.get("local_first"),
+                                         coalesce_key=request_key("search", job_description, profile_count=profile_count,
+                                                                  local_first=data.get("local_first")))
         return candidates
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @app.post("/search-fast", response_model=List[CandidateResponse])
-async def search_candidates_fast(request: Request):
+async def search_candidates_fast(request: Request, response: Response):
     data = await request.json()
     job_description = data.get("description", "")
     profile_count = int(data.get("profile_count", 10))
     try:
-        candidates = agent.search_linkedin(job_description, use_ai_analysis=False, num_results=profile_count)
+        candidates = await run_reporting(response, agent.search_linkedin, job_description, use_ai_analysis=False, num_results=profile_count,
+                                         local_first=data.get("local_first"),
+                                         coalesce_key=request_key("search-fast", job_description, profile_count=profile_count,
+                                                                  local_first=data.get("local_first")))
         return candidates
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@app.post("/profiles/search", response_model=List[ProfileHit])
+async def search_profiles(query: ProfileQuery):
+    """BM25 search over locally stored profiles; match "all" only returns profiles containing every term"""
+    if agent.profile_index is None:
+        raise HTTPException(status_code=404, detail="Profile store is disabled")
+    try:
+        hits = await run_blocking(agent.profile_index.search, query.query, limit=max(0, query.limit), match=query.match)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [{"score": score, "candidate": candidate} for score, candidate in hits]
+
+def match_stored_profiles(job_description: str, top_k: int = 10, prefilter: int = None,
+                          weights: Dict[str, float] = None) -> List[Dict[str, Any]]:
+    """Rubric-score only the stored profiles semantically closest to the job description"""
+    pool = agent.search_semantic(job_description, num_results=max(prefilter or SEMANTIC_PREFILTER_SIZE, top_k))
+    return score_candidates_fast(pool, job_description, top_k=top_k, weights=weights)
+
+@app.post("/profiles/match", response_model=List[ScoredCandidate])
+async def match_profiles(query: ProfileMatchQuery, response: Response):
+    """Best stored profiles for a job: embedding (IVF) retrieval pre-filters the pool, fast scoring ranks it"""
+    if agent.embedding_index is None:
+        raise HTTPException(status_code=404, detail="Embedding index is disabled")
+    try:
+        resolve_weights(query.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await run_reporting(response, match_stored_profiles, query.description, top_k=max(1, query.top_k),
+                                   prefilter=query.prefilter, weights=query.weights)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Matching failed: {str(e)}")
+
 @app.post("/score", response_model=List[ScoredCandidate])
-async def score_candidates_endpoint(job: JobDescription, candidates: List[CandidateResponse]):
+async def score_candidates_endpoint(job: JobDescription, candidates: List[CandidateResponse], response: Response,
+                                    top_k: Optional[int] = Query(None, ge=1)):
     """Score candidates using enhanced AI-powered scoring"""
     try:
         # Convert Pydantic models to dicts
         candidates_dict = [c.dict() for c in candidates]
-        scored = score_candidates_enhanced(candidates_dict, job.description, use_ai_for_top=True)
+        scored = await run_reporting(response, score_candidates_enhanced, candidates_dict, job.description, use_ai_for_top=True, top_k=top_k,
+                                     coalesce_key=request_key("score", job.description, candidates=candidates_dict, top_k=top_k))
         return scored
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scoring failed: {str(e)}")
 
 @app.post("/score-fast", response_model=List[ScoredCandidate])
-async def score_candidates_fast_endpoint(job: JobDescription, candidates: List[CandidateResponse]):
-    """Score candidates using fast scoring without AI"""
+async def score_candidates_fast_endpoint(job: JobDescription, candidates: List[CandidateResponse], response: Response,
+                                         top_k: Optional[int] = Query(None, ge=1),
+                                         weights: Optional[Dict[str, float]] = Body(None)):
+    """Score candidates using fast scoring without AI, optionally with custom dimension weights"""
+    try:
+        resolve_weights(weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         # Convert Pydantic models to dicts
         candidates_dict = [c.dict() for c in candidates]
-        scored = score_candidates_fast(candidates_dict, job.description)
+        scored = await run_reporting(response, score_candidates_fast, candidates_dict, job.description, top_k=top_k,
+                                     weights=weights,
+                                     coalesce_key=request_key("score-fast", job.description, candidates=candidates_dict,
+                                                              top_k=top_k, weights=weights))
         return scored
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scoring failed: {str(e)}")
 
+@app.post("/score-jobs", response_model=List[JobRanking])
+async def score_jobs_endpoint(jobs: List[JobDescription], candidates: List[CandidateResponse], response: Response,
+                              top_k: Optional[int] = Query(None, ge=1),
+                              weights: Optional[Dict[str, float]] = Body(None)):
+    """Rank one candidate pool for several jobs with fast scoring; candidate features are extracted once"""
+    if not jobs:
+        raise HTTPException(status_code=400, detail="At least one job is required")
+    try:
+        resolve_weights(weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        candidates_dict = [c.dict() for c in candidates]
+        descriptions = [job.description for job in jobs]
+        rankings = await run_reporting(response, score_jobs_fast, candidates_dict, descriptions, top_k=top_k,
+                                       weights=weights)
+        return [{"description": d, "candidates": ranked} for d, ranked in zip(descriptions, rankings)]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Scoring failed: {str(e)}")
+
 @app.post("/outreach", response_model=List[OutreachMessage])
-async def generate_outreach_endpoint(job: JobDescription, scored_candidates: List[ScoredCandidate]):
+async def generate_outreach_endpoint(job: JobDescription, scored_candidates: List[ScoredCandidate], response: Response):
     """Generate personalized outreach messages using AI"""
     try:
         # Convert Pydantic models to dicts
         candidates_dict = [c.dict() for c in scored_candidates]
-        messages = generate_outreach_enhanced(candidates_dict, job.description)
+        messages = await run_reporting(response, generate_outreach_enhanced, candidates_dict, job.description,
+                                       coalesce_key=request_key("outreach", job.description, candidates=candidates_dict))
         return messages
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Outreach generation failed: {str(e)}")
 
+def run_pipeline(job_description: str, profile_count: int = 10, top_k: int = None, deadline_ms: int = None,
+                 local_first: bool = None, report=None) -> Dict[str, Any]:
+    """Search, score and generate outreach; report(stage, status, **info) receives per-stage progress.
+
+    With deadline_ms, each stage gets a share of that budget and falls back once its share
+    is spent (basic search terms, fewer CSE pages, basic analysis, basic scores, template
+    messages). The result's "degraded" list names every stage where results fell back, with
+    how many and why; "timings" breaks the run's time down by stage. local_first overrides
+    SEARCH_LOCAL_FIRST for the search stage.
+    """
+    report = report or (lambda stage, status, **info: None)
+    budget = Budget(deadline_ms / 1000) if deadline_ms else None
+    started = time.perf_counter()
+    with collect_degradations() as degraded, collect_timings() as timings:
+        report("search", "running")
+        with span("search"):
+            candidates = agent.search_linkedin(job_description, use_ai_analysis=True, num_results=profile_count,
+                                               budget=budget, local_first=local_first)
+        report("search", "done", candidates=len(candidates))
+        report("scoring", "running")
+        scored = score_candidates_enhanced(candidates, job_description, use_ai_for_top=True, top_k=top_k,
+                                           ai_deadline=budget.for_stage("ai_rescoring") if budget else None)
+        report("scoring", "done", scored=len(scored))
+        report("outreach", "running")
+        top_candidates = heapq.nlargest(5, scored, key=lambda x: x['score'])
+        messages = generate_outreach_enhanced(top_candidates, job_description,
+                                              deadline=budget.for_stage("outreach") if budget else None)
+        report("outreach", "done", messages=len(messages))
+    return {
+        "candidates": candidates,
+        "scored_candidates": scored,
+        "outreach_messages": messages,
+        "degraded": summarize_degradations(degraded),
+        "timings": {"total_ms": round((time.perf_counter() - started) * 1000, 1), "stages": summarize_timings(timings)}
+    }
+
+def _pipeline_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_description": data.get("description", ""),
+        "profile_count": int(data.get("profile_count", 10)),
+        "top_k": int(data["top_k"]) if data.get("top_k") else None,
+        "deadline_ms": int(data["deadline_ms"]) if data.get("deadline_ms") else None,
+        "local_first": bool(data["local_first"]) if data.get("local_first") is not None else None
+    }
+
+job_queue.register("full-pipeline", lambda params, report: run_pipeline(report=report, **params))
+
 @app.post("/full-pipeline")
-async def full_pipeline(request: Request):
+async def full_pipeline(request: Request, response: Response):
     data = await request.json()
-    job_description = data.get("description", "")
-    profile_count = int(data.get("profile_count", 10))
+    params = _pipeline_params(data)
     try:
-        candidates = agent.search_linkedin(job_description, use_ai_analysis=True, num_results=profile_count)
-        scored = score_candidates_enhanced(candidates, job_description, use_ai_for_top=True)
-        top_candidates = sorted(scored, key=lambda x: x['score'], reverse=True)[:5]
-        messages = generate_outreach_enhanced(top_candidates, job_description)
-        return {
-            "candidates": candidates,
-            "scored_candidates": scored,
-            "outreach_messages": messages
-        }
+        result, shared = await in_flight.do(request_key("full-pipeline", **params), run_blocking, run_pipeline, **params)
+        if shared:
+            response.headers["X-Coalesced"] = "true"
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pipeline failed: {str(e)}")
 
+def _job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in job.items() if k != "result"}
+
+@app.post("/jobs", status_code=202)
+async def submit_pipeline_job(request: Request):
+    """Queue a full-pipeline run and return its job id immediately"""
+    data = await request.json()
+    job = job_queue.submit("full-pipeline", _pipeline_params(data))
+    return {"job_id": job["id"], "status": job["status"]}
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Job status and per-stage progress (without the result payload)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Pipeline failed: {job['error']}")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
+@app.post("/full-pipeline/stream")
+async def full_pipeline_stream(request: Request):
+    """Full pipeline streamed as NDJSON: one event per line as each stage produces results.
+
+    Events: "candidates" (one per CSE page), "scores" (basic scores for that page),
+    "ranking" (final scores incl. AI rescoring), "outreach" (one per message, with its
+    index in the shortlist), then "done" - or "error" if the pipeline fails midway. Both
+    final events carry a "degraded" summary of the stages that fell back and the run's "timings".
+    """
+    params = _pipeline_params(await request.json())
+    job_description, profile_count, top_k = params["job_description"], params["profile_count"], params["top_k"]
+
+    def events():
+        candidates = []
+        try:
+            for page in agent.iter_search_linkedin(job_description, use_ai_analysis=True, num_results=profile_count,
+                                                   local_first=params["local_first"]):
+                candidates.extend(page)
+                yield {"event": "candidates", "data": page}
+                yield {"event": "scores", "data": score_candidates_fast(page, job_description)}
+            scored = score_candidates_enhanced(candidates, job_description, use_ai_for_top=True, top_k=top_k)
+            yield {"event": "ranking", "data": scored}
+            top_candidates = heapq.nlargest(5, scored, key=lambda x: x['score'])
+            for index, message in iter_outreach_enhanced(top_candidates, job_description):
+                yield {"event": "outreach", "index": index, "data": message}
+            yield {"event": "done"}
+        except Exception as e:
+            yield {"event": "error", "detail": f"Pipeline failed: {str(e)}"}
+
+    async def lines():
+        # Each step of the blocking generator runs on the pipeline executor
+        iterator = events()
+        finished = object()
+        degraded, timings = [], []
+        started = time.perf_counter()
+        while True:
+            event = await run_blocking(_collecting, degraded, timings, next, iterator, finished)
+            if event is finished:
+                break
+            if event["event"] in ("done", "error"):
+                event["degraded"] = summarize_degradations(degraded)
+                event["timings"] = {"total_ms": round((time.perf_counter() - started) * 1000, 1),
+                                    "stages": summarize_timings(timings)}
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "groq_available": agent.use_groq,
-        "google_available": not agent.use_static
+        "google_available": not agent.use_static,
+        "llm_cache": get_llm_cache().stats(),
+        "batch_cache": get_batch_cache().stats(),
+        "profile_index": agent.profile_index.stats() if agent.profile_index is not None else None,
+        "embedding_index": agent.embedding_index.stats() if agent.embedding_index is not None else None,
+        "coalescing": in_flight.stats(),
+        "providers": guard_stats()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage, Groq call and request latency histograms in the Prometheus text format"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # if __name__ == "__main__":
 #     import uvicorn
 #     uvicorn.run(app, host="0.0.0.0", port=8000) 
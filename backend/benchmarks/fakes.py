@@ -0,0 +1,179 @@
+"""Local stand-ins for Groq and Google Custom Search with configurable latency, error rate and payload size.
+
+They mimic just enough of the real client interfaces (``client.chat.completions.create``
+and ``service.cse().list(...).execute()``) for the pipeline to run unchanged. Injected
+failures use the real SDK exception types, so the retry/circuit-breaker layer treats them
+like provider errors. Whether a call fails depends only on the seed, the request and how
+many times that request was already tried - not on thread scheduling - so runs repeat.
+"""
+import json
+import time
+import zlib
+import random
+import threading
+from types import SimpleNamespace
+
+import groq
+import httpx
+import httplib2
+from googleapiclient.errors import HttpError
+
+from app.core.clients import get_client_registry
+from app.core.enhanced_outreach import reset_outreach_generator
+
+
+class _FailureInjector:
+    """Deterministic per-request failures: attempt n of a given key fails iff hash(seed, key, n) < error_rate"""
+
+    def __init__(self, error_rate: float = 0.0, seed: int = 0):
+        self.error_rate = error_rate
+        self.seed = seed
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def should_fail(self, key: str) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            attempt = self._attempts[key] = self._attempts.get(key, 0) + 1
+        return zlib.crc32(f"{self.seed}:{attempt}:{key}".encode()) / 2 ** 32 < self.error_rate
+
+
+class FakeGroqClient:
+    """Answers every prompt the pipeline sends with a well-formed reply after a fixed delay.
+
+    error_rate is the chance that a call fails with a 503; payload_size pads every reply
+    with that many extra characters.
+    """
+
+    def __init__(self, latency: float = 0.3, error_rate: float = 0.0, payload_size: int = 0, seed: int = 0):
+        self.latency = latency
+        self.payload_size = payload_size
+        self.failures = _FailureInjector(error_rate, seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _reply(self, prompt: str) -> str:
+        padding = "x" * self.payload_size
+        if "Extract search terms" in prompt:
+            return json.dumps({"job_titles": ["ML Engineer"], "skills": ["Python"], "location": ["Mountain View"], "companies": [],
+                               "notes": padding})
+        if "Analyze this LinkedIn profile" in prompt:
+            return json.dumps({"education": ["Stanford"], "companies": ["Google"], "skills": ["Python", "PyTorch"],
+                               "experience_years": 5, "location": "Mountain View", "role_level": "senior", "industry": "ai",
+                               "notes": padding})
+        if "Score each candidate" in prompt:
+            ids = [part.split('"')[0] for part in prompt.split('"id": "')[1:]]
+            return json.dumps([{"id": i, "total_score": 8.0, "breakdown": {"education": 8.0}, "notes": padding} for i in ids])
+        if "Score this candidate" in prompt:
+            return json.dumps({"total_score": 8.0, "breakdown": {"education": 8.0, "experience": 8.0}, "notes": padding})
+        return "Hi there, your background looks like a great fit for a role we are hiring for. Open to a quick chat?" + padding
+
+    def create(self, model, messages, temperature=0.0, max_tokens=None, **kwargs):
+        time.sleep(self.latency)
+        prompt = messages[-1]["content"]
+        if self.failures.should_fail(f"{model}:{prompt}"):
+            request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+            raise groq.InternalServerError("injected failure", response=httpx.Response(503, request=request), body=None)
+        content = self._reply(prompt)
+        # Rough token counts (~4 characters per token) so usage metrics have something to show
+        usage = SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(content) // 4)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+class _FakeRequest:
+    def __init__(self, service, q, num, start):
+        self.service, self.q, self.num, self.start = service, q, num, start
+
+    def execute(self, http=None, **kwargs):
+        return self.service._execute(self.q, self.num, self.start)
+
+
+class FakeCSEService:
+    """Serves total_results synthetic LinkedIn hits, paginated like Custom Search.
+
+    error_rate is the chance that a page request fails with a 503; payload_size pads every
+    snippet with that many extra characters.
+    """
+
+    def __init__(self, latency: float = 0.3, total_results: int = 30, error_rate: float = 0.0, payload_size: int = 0,
+                 seed: int = 0):
+        self.latency = latency
+        self.total_results = total_results
+        self.payload_size = payload_size
+        self.failures = _FailureInjector(error_rate, seed)
+
+    def cse(self):
+        return self
+
+    def list(self, q, cx, num=10, start=1, **kwargs):
+        return _FakeRequest(self, q, num, start)
+
+    def _execute(self, q, num, start):
+        time.sleep(self.latency)
+        if self.failures.should_fail(f"{q}:{start}"):
+            raise HttpError(httplib2.Response({"status": 503}), b'{"error": {"message": "injected failure"}}')
+        end = min(start + num, self.total_results + 1)
+        padding = " " + "x" * self.payload_size if self.payload_size else ""
+        return {"items": [
+            {
+                "link": f"https://www.linkedin.com/in/candidate-{i}",
+                "title": f"Candidate {i} - ML Engineer - LinkedIn",
+                "snippet": f"Senior ML Engineer at Google, Stanford, {i % 7 + 1} years, Mountain View{padding}"
+            }
+            for i in range(start, end)
+        ]}
+
+
+def install_fakes(agent, groq_latency: float = 0.3, cse_latency: float = 0.3, total_results: int = 30,
+                  error_rate: float = 0.0, payload_size: int = 0, seed: int = 0):
+    """Point an EnhancedLinkedInSourcingAgent, and the scoring and outreach stages, at the fakes.
+
+    The fake Groq client also replaces the shared client in the client registry, so AI
+    rescoring and outreach run (against the fake) whether or not GROQ_API_KEY is set.
+    """
+    agent.groq_client = FakeGroqClient(groq_latency, error_rate, payload_size, seed)
+    get_client_registry().set_groq(agent.groq_client)
+    reset_outreach_generator()
+    agent.use_groq = True
+    agent.service = FakeCSEService(cse_latency, total_results, error_rate, payload_size, seed)
+    agent.search_engine_id = "fake"
+    agent.use_static = False
+    agent.profile_store = None
+    agent.profile_index = None
+    agent.embedding_index = None
+    return agent
+
+
+_SCHOOLS = ["MIT", "Stanford", "Carnegie Mellon", "UC Berkeley", "Georgia Tech", "University of Washington",
+            "State University", "Community College", "IIT Bombay", "Tsinghua"]
+_COMPANIES = ["Google", "Meta", "OpenAI", "Amazon", "Stripe", "a fintech startup", "an AI startup", "Acme Corp",
+              "a SaaS company", "Initech"]
+_TITLES = ["Senior ML Engineer", "Staff Software Engineer", "Research Scientist", "Data Scientist", "ML Intern",
+           "Principal Engineer", "Backend Developer", "Junior Data Analyst", "Head of AI", "Software Engineer"]
+_LOCATIONS = ["Mountain View", "Palo Alto", "San Francisco", "Seattle", "New York", "Remote", "Austin", "London",
+              "Bangalore", "Berlin"]
+_SKILLS = ["python", "pytorch", "tensorflow", "kubernetes", "sql", "java", "go", "llm", "transformers", "spark",
+           "react", "c++", "rust", "aws", "docker"]
+
+
+def synthetic_candidates(count: int, seed: int = 0):
+    """count reproducible candidate profiles shaped like the pipeline's enriched candidates"""
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(count):
+        title, company = rng.choice(_TITLES), rng.choice(_COMPANIES)
+        years = rng.randint(0, 15)
+        candidates.append({
+            "name": f"Candidate {i}",
+            "linkedin_url": f"https://www.linkedin.com/in/candidate-{seed}-{i}",
+            "headline": f"{title} at {company} | {years} years | {rng.choice(_SCHOOLS)} | {rng.choice(_LOCATIONS)}",
+            "title": title,
+            "education": rng.sample(_SCHOOLS, rng.randint(0, 2)),
+            "companies": rng.sample(_COMPANIES, rng.randint(0, 3)),
+            "skills": rng.sample(_SKILLS, rng.randint(0, 6)),
+            "experience_years": years,
+            "location": rng.choice(_LOCATIONS),
+            "role_level": rng.choice(["junior", "mid", "senior"]),
+            "industry": rng.choice(["ai", "fintech", "saas", ""])
+        })
+    return candidates
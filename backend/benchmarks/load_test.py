@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Concurrent load test for the API.
+
+By default it runs the app in-process against the fake Groq/CSE providers, so the
+numbers reflect how well one worker overlaps requests rather than real API latency:
+
+    cd backend
+    python benchmarks/load_test.py --requests 100 --concurrency 20
+
+Point it at a running server instead with --url http://localhost:8000.
+While the load runs, /health is probed continuously to show whether the event loop
+stays responsive.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else None
+    }
+
+
+def use_fake_environment():
+    """No caching, persistence or client-side rate limits, so runs measure the pipeline itself"""
+    os.environ.setdefault("LLM_CACHE_DISABLED", "true")
+    os.environ.setdefault("PROFILE_STORE_DISABLED", "true")
+    os.environ.setdefault("GROQ_REQUESTS_PER_SECOND", "0")
+    os.environ.setdefault("CSE_REQUESTS_PER_SECOND", "0")
+
+
+def in_process_client(groq_latency: float = 0.3, cse_latency: float = 0.3, timeout: float = 120.0,
+                      error_rate: float = 0.0, payload_size: int = 0, seed: int = 0) -> httpx.AsyncClient:
+    """AsyncClient bound to the app over ASGI, with the agent pointed at the fake providers"""
+    use_fake_environment()
+    from benchmarks.fakes import install_fakes
+    from app import enhanced_main
+    install_fakes(enhanced_main.agent, groq_latency=groq_latency, cse_latency=cse_latency,
+                  error_rate=error_rate, payload_size=payload_size, seed=seed)
+    transport = httpx.ASGITransport(app=enhanced_main.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout)
+
+
+def build_client(args):
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    return in_process_client(args.groq_latency, args.cse_latency, args.timeout)
+
+
+async def drive(client, endpoint, body_for, requests, concurrency, on_response=None):
+    """POST body_for(i) to endpoint for i in range(requests) from concurrency workers.
+
+    on_response(response) is called for every successful response. Returns
+    (latencies of successful requests, error count, elapsed seconds).
+    """
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=body_for(i))
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+                if on_response is not None:
+                    on_response(response)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(args):
+    async with build_client(args) as client:
+        health_latencies = []
+        stop = asyncio.Event()
+
+        async def probe_health():
+            while not stop.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.1)
+
+        prober = asyncio.create_task(probe_health())
+        latencies, errors, elapsed = await drive(
+            client, args.endpoint,
+            lambda i: {"description": f"{args.description} (request {i})", "profile_count": args.profile_count},
+            args.requests, args.concurrency
+        )
+        stop.set()
+        await prober
+
+    return {
+        "endpoint": args.endpoint,
+        "target": args.url or "in-process (fake providers)",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency": summarize(latencies),
+        "health_latency_under_load": summarize(health_latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app with fakes)")
+    parser.add_argument("--endpoint", default="/search")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--profile-count", type=int, default=10)
+    parser.add_argument("--description", default="ML Engineer with Python and LLM experience in Mountain View")
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="Fake Groq latency in seconds")
+    parser.add_argument("--cse-latency", type=float, default=0.3, help="Fake CSE latency in seconds")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
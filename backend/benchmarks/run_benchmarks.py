@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the sourcing pipeline, run against local fake providers.
+
+Suites:
+  scoring   score_candidates_fast throughput on 1k-1M synthetic profiles, plus the
+            re-rank throughput when the CandidateBatch is reused directly and when it
+            is found in the BatchCache (fingerprinting included)
+  pipeline  end-to-end /full-pipeline latency percentiles over the ASGI app
+  scaling   /full-pipeline throughput and latency as client concurrency grows
+
+Everything is seeded, and results are printed (or written with --output) as one JSON
+document so runs can be compared between releases:
+
+    cd backend
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --suites scoring --sizes 1000,100000
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import synthetic_candidates
+from benchmarks.load_test import use_fake_environment, in_process_client, drive, summarize
+
+JOB_DESCRIPTION = "Senior ML Engineer with Python, PyTorch and LLM experience in Mountain View"
+RERANK_DESCRIPTION = "Staff backend engineer, Go, Kubernetes and AWS, remote or Seattle"
+
+
+def _best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings)
+
+
+def bench_scoring(args):
+    from app.core.enhanced_scoring import score_candidates_fast
+    from app.core.batch_scoring import CandidateBatch, BatchCache, score_candidates_batch, get_batch_cache
+
+    def cold():
+        get_batch_cache().clear()
+        score_candidates_fast(candidates, JOB_DESCRIPTION, top_k=args.top_k)
+
+    results = []
+    for size in args.sizes:
+        candidates = synthetic_candidates(size, seed=args.seed)
+        best, median = _best_of(args.repeat, cold)
+        batch = CandidateBatch(candidates)
+        rerank_best, rerank_median = _best_of(
+            args.repeat, lambda: score_candidates_batch(candidates, RERANK_DESCRIPTION, top_k=args.top_k, batch=batch)
+        )
+        cache = BatchCache(max_candidates=size)
+        cache.get(candidates)
+        cached_best, cached_median = _best_of(
+            args.repeat, lambda: score_candidates_batch(candidates, RERANK_DESCRIPTION, top_k=args.top_k,
+                                                        batch=cache.get(candidates))
+        )
+        results.append({
+            "candidates": size,
+            "top_k": args.top_k,
+            "score_s": {"best": round(best, 4), "median": round(median, 4)},
+            "candidates_per_s": round(size / best),
+            "rerank_s": {"best": round(rerank_best, 4), "median": round(rerank_median, 4)},
+            "rerank_candidates_per_s": round(size / rerank_best),
+            "cached_rescore_s": {"best": round(cached_best, 4), "median": round(cached_median, 4)},
+            "cached_rescore_candidates_per_s": round(size / cached_best)
+        })
+        del candidates, batch, cache
+    return results
+
+
+def _pipeline_body(tag):
+    return lambda i: {"description": f"{JOB_DESCRIPTION} ({tag} {i})", "profile_count": 10}
+
+
+class _ResponseStats:
+    """Collects the degraded flags and server-side stage timings of /full-pipeline responses"""
+
+    def __init__(self):
+        self.degraded = 0
+        self.stage_ms = {}
+
+    def __call__(self, response):
+        body = response.json()
+        if body.get("degraded"):
+            self.degraded += 1
+        for stage, entry in body.get("timings", {}).get("stages", {}).items():
+            self.stage_ms.setdefault(stage, []).append(entry["total_ms"])
+
+    def summary(self):
+        return {
+            "degraded_responses": self.degraded,
+            "stage_total_ms_mean": {stage: round(statistics.mean(v), 1) for stage, v in sorted(self.stage_ms.items())}
+        }
+
+
+def _client(args):
+    return in_process_client(args.groq_latency, args.cse_latency, error_rate=args.error_rate,
+                             payload_size=args.payload_size, seed=args.seed)
+
+
+async def bench_pipeline(args):
+    stats = _ResponseStats()
+    async with _client(args) as client:
+        latencies, errors, elapsed = await drive(client, "/full-pipeline", _pipeline_body("pipeline"),
+                                                 args.pipeline_requests, 1, on_response=stats)
+    return dict({"requests": args.pipeline_requests, "errors": errors, "latency": summarize(latencies)}, **stats.summary())
+
+
+async def bench_scaling(args):
+    levels = []
+    async with _client(args) as client:
+        for concurrency in args.concurrency:
+            requests = max(args.scaling_requests, concurrency * 2)
+            latencies, errors, elapsed = await drive(client, "/full-pipeline", _pipeline_body(f"scaling c{concurrency}"),
+                                                     requests, concurrency)
+            levels.append({
+                "concurrency": concurrency,
+                "requests": requests,
+                "errors": errors,
+                "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+                "latency": summarize(latencies)
+            })
+    return levels
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(args):
+    import numpy as np
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "config": {
+            "seed": args.seed,
+            "groq_latency_s": args.groq_latency,
+            "cse_latency_s": args.cse_latency,
+            "error_rate": args.error_rate,
+            "payload_size": args.payload_size
+        }
+    }
+    if "scoring" in args.suites:
+        report["scoring"] = bench_scoring(args)
+    if "pipeline" in args.suites:
+        report["pipeline"] = asyncio.run(bench_pipeline(args))
+    if "scaling" in args.suites:
+        report["scaling"] = asyncio.run(bench_scaling(args))
+    return report
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", default="scoring,pipeline,scaling", type=lambda v: v.split(","))
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", type=_int_list, help="Profile counts for the scoring suite")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3, help="Scoring runs per size (best and median are reported)")
+    parser.add_argument("--pipeline-requests", type=int, default=30)
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", type=_int_list, help="Levels for the scaling suite")
+    parser.add_argument("--scaling-requests", type=int, default=32, help="Requests per concurrency level (at least 2x the level)")
+    parser.add_argument("--groq-latency", type=float, default=0.1, help="Fake Groq latency in seconds")
+    parser.add_argument("--cse-latency", type=float, default=0.1, help="Fake CSE latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake provider calls that fail with a 503")
+    parser.add_argument("--payload-size", type=int, default=0, help="Extra characters added to every fake reply")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    use_fake_environment()
+    # Keep stdout for the JSON report; the app's own prints go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
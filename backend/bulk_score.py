@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Score large candidate exports offline with the basic (rule-based) scorer.
+
+Candidates are streamed from a JSONL or CSV file (optionally .gz, or "-" for stdin),
+scored in chunks, and written best first to a JSONL or CSV file. Memory stays flat
+however large the input is: ranked output is produced by an external merge of sorted
+per-chunk run files, or from a running shortlist with --top-k.
+
+    cd backend
+    python bulk_score.py profiles.jsonl --job "Senior ML engineer, Python, PyTorch" -o ranked.csv
+    python bulk_score.py dump.csv.gz --job-file jd.txt --top-k 500 --workers 8 -o shortlist.jsonl
+
+CSV input needs a header row; education, companies and skills columns hold a JSON
+array or a ";"-separated list.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.bulk_scoring import read_candidates, rank_candidates, write_ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or CSV file of candidates (.gz is fine, - reads stdin)")
+    job = parser.add_mutually_exclusive_group(required=True)
+    job.add_argument("--job", help="Job description text")
+    job.add_argument("--job-file", help="File holding the job description")
+    parser.add_argument("-o", "--output", default="-", help="Ranked JSONL or CSV output (default: JSONL on stdout)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], help="Override the format implied by the extension")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], help="Override the format implied by the extension")
+    parser.add_argument("--top-k", type=int, help="Only write the best k candidates")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Candidates scored per batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes (1 = score in this process)")
+    parser.add_argument("--tmp-dir", help="Where sorted run files are kept while merging (default: system temp dir)")
+    args = parser.parse_args()
+
+    if args.job_file:
+        with open(args.job_file, encoding="utf-8") as f:
+            job_description = f.read()
+    else:
+        job_description = args.job
+
+    started = time.perf_counter()
+
+    def progress(scored):
+        elapsed = time.perf_counter() - started
+        print(f"Scored {scored} candidates ({scored / elapsed:.0f}/s)", file=sys.stderr)
+
+    ranked = rank_candidates(
+        read_candidates(args.input, args.input_format),
+        job_description,
+        chunk_size=max(1, args.chunk_size),
+        workers=max(1, args.workers),
+        top_k=args.top_k,
+        tmp_dir=args.tmp_dir,
+        on_chunk=progress
+    )
+    written = write_ranked(ranked, args.output, args.output_format)
+    print(f"Wrote {written} ranked candidates in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
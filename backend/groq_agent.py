@@ -1,15 +1,35 @@
 import os
 import requests
-from googleapiclient.discovery import build
 from dotenv import load_dotenv
-from groq import Groq
 import json
 import time
+import sqlite3
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from app.core.env import env_flag
+from app.core.resilience import get_guard, record_degraded, describe_failure
+from app.core.metrics import span
+from app.core.concurrency import iter_concurrently, call_with_timeout
+from app.core.clients import get_client_registry
+from app.core.llm_cache import cached_completion
+from app.core.profile_store import get_profile_store, normalize_linkedin_url
+from app.core.profile_index import ProfileIndex, get_profile_index, extract_basic_terms, job_terms
+from app.core.embeddings import EmbeddingIndex, get_embedding_index
 
 load_dotenv()
 
+# Custom Search returns at most 10 results per page and serves results up to start=30 here
+CSE_PAGE_SIZE = 10
+CSE_MAX_START = 30
+
+# Local-first searches only use indexed profiles whose BM25 score beats LOCAL_SEARCH_MIN_SCORE
+# and that contain at least LOCAL_SEARCH_MIN_MATCH of the job's search terms
+LOCAL_SEARCH_MIN_SCORE = float(os.getenv('LOCAL_SEARCH_MIN_SCORE', 0))
+LOCAL_SEARCH_MIN_MATCH = float(os.getenv('LOCAL_SEARCH_MIN_MATCH', 0.3))
+
 class EnhancedLinkedInSourcingAgent:
-    def __init__(self):
+    def __init__(self, groq_client=None, profile_store=None):
         self.api_key = os.getenv('GOOGLE_API_KEY')
         self.search_engine_id = os.getenv('GOOGLE_SEARCH_ENGINE_ID')
         self.groq_api_key = os.getenv('GROQ_API_KEY')
@@ -19,16 +39,55 @@ class EnhancedLinkedInSourcingAgent:
             self.use_static = True
         else:
             self.use_static = False
-            self.service = build("customsearch", "v1", developerKey=self.api_key)
+            self.service = get_client_registry().cse_service()
         
-        # Initialize Groq client
-        if self.groq_api_key:
-            self.groq_client = Groq(api_key=self.groq_api_key)
+        # Initialize Groq client (an injected client is used as-is, e.g. a local fake)
+        if groq_client is not None:
+            self.groq_client = groq_client
+            self.use_groq = True
+        elif self.groq_api_key:
+            self.groq_client = get_client_registry().groq()
             self.use_groq = True
         else:
             print("Warning: Groq API key not found. Using basic functionality.")
             self.use_groq = False
 
+        # Concurrency cap and pacing for per-candidate AI analysis
+        self.max_concurrency = max(1, int(os.getenv('GROQ_MAX_CONCURRENCY', 8)))
+        # Shared rate limit, retries and circuit breaker per provider
+        self.groq_guard = get_guard('groq')
+        self.cse_guard = get_guard('cse')
+
+        # Fetch CSE result pages concurrently unless disabled
+        self.parallel_pages = env_flag('CSE_PARALLEL_PAGES', default=True)
+
+        # Sourced profiles are persisted so later searches only enrich new or stale ones,
+        # and indexed so local-first searches can be answered without CSE
+        if profile_store is not None:
+            self.profile_store = profile_store
+            self.profile_index = ProfileIndex.from_store(profile_store)
+        elif env_flag('PROFILE_STORE_DISABLED'):
+            self.profile_store = None
+            self.profile_index = None
+        else:
+            try:
+                self.profile_store = get_profile_store()
+                self.profile_index = get_profile_index(self.profile_store)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Warning: profile store unavailable ({e}). Continuing without stored profiles.")
+                self.profile_store = None
+                self.profile_index = None
+        self.local_first = env_flag('SEARCH_LOCAL_FIRST')
+
+        # Hashed-embedding ANN index over the same profiles, for semantic retrieval
+        if self.profile_index is None or env_flag('EMBEDDING_INDEX_DISABLED'):
+            self.embedding_index = None
+        elif profile_store is not None:
+            self.embedding_index = EmbeddingIndex()
+            self.embedding_index.add_candidates(self.profile_index.profiles())
+        else:
+            self.embedding_index = get_embedding_index(self.profile_index.profiles())
+
     def extract_search_terms_with_ai(self, job_description):
         """Use Groq/Llama to intelligently extract search terms from job description"""
         if not self.use_groq:
@@ -45,14 +104,14 @@ class EnhancedLinkedInSourcingAgent:
         """
         
         try:
-            response = self.groq_client.chat.completions.create(
+            result = cached_completion(
+                self.groq_client,
                 model="llama3-8b-8192",
-                messages=[{"role": "user", "content": prompt}],
+                prompt=prompt,
                 temperature=0.1,
-                max_tokens=200
+                max_tokens=200,
+                guard=self.groq_guard
             )
-            
-            result = response.choices[0].message.content
             if result:
                 result = result.strip()
                 # Extract JSON from response
@@ -79,23 +138,13 @@ class EnhancedLinkedInSourcingAgent:
                 
         except Exception as e:
             print(f"Error with Groq API: {e}")
+            record_degraded("search_terms", describe_failure(e))
             return self._extract_search_terms_basic(job_description)
 
     def _extract_search_terms_basic(self, job_description):
         """Basic search term extraction (fallback)"""
-        terms = set()
-        
-        job_titles = ["ML Engineer", "LLM Researcher", "Software Engineer", "AI Scientist", "Backend Engineer"]
-        companies = ["Windsurf", "Codeium"]
-        locations = ["Mountain View", "California", "Bay Area"]
-        techs = ["Python", "LLM", "AI", "Transformer", "Deep Learning"]
-        
-        lower_desc = job_description.lower()
-        
-        terms.update([t for t in job_titles if t.lower() in lower_desc])
-        terms.update([c for c in companies if c.lower() in lower_desc])
-        terms.update([l for l in locations if l.lower() in lower_desc])
-        terms.update([tech for tech in techs if tech.lower() in lower_desc])
+        # Job titles, companies, locations and techs (shared with the local profile index)
+        terms = set(extract_basic_terms(job_description))
         
         return " ".join(list(terms)[:5])
 
@@ -103,7 +152,10 @@ class EnhancedLinkedInSourcingAgent:
         """Use Groq/Llama to analyze candidate profile - OPTIMIZED VERSION"""
         if not self.use_groq:
             return self._analyze_candidate_basic(candidate)
-        
+        return self._analyze_candidate_ai(candidate, job_description) or self._analyze_candidate_basic(candidate)
+
+    def _analyze_candidate_ai(self, candidate, job_description):
+        """AI analysis of a candidate profile; returns None when Groq fails or the reply cannot be parsed"""
         # Simplified prompt for faster processing
         prompt = f"""
         Analyze this LinkedIn profile for job matching.
@@ -117,14 +169,14 @@ class EnhancedLinkedInSourcingAgent:
         """
         
         try:
-            response = self.groq_client.chat.completions.create(
+            result = cached_completion(
+                self.groq_client,
                 model="llama3-8b-8192",
-                messages=[{"role": "user", "content": prompt}],
+                prompt=prompt,
                 temperature=0.1,
-                max_tokens=150
+                max_tokens=150,
+                guard=self.groq_guard
             )
-            
-            result = response.choices[0].message.content
             if result:
                 result = result.strip()
                 json_start = result.find('{')
@@ -133,15 +185,14 @@ class EnhancedLinkedInSourcingAgent:
                     try:
                         return json.loads(result[json_start:json_end])
                     except json.JSONDecodeError:
-                        return self._analyze_candidate_basic(candidate)
-                else:
-                    return self._analyze_candidate_basic(candidate)
-            else:
-                return self._analyze_candidate_basic(candidate)
+                        pass
+            record_degraded("enrichment", "unparseable", candidate.get("linkedin_url"))
+            return None
                 
         except Exception as e:
             print(f"Error analyzing candidate with Groq: {e}")
-            return self._analyze_candidate_basic(candidate)
+            record_degraded("enrichment", describe_failure(e), candidate.get("linkedin_url"))
+            return None
 
     def _analyze_candidate_basic(self, candidate):
         """Basic candidate analysis (fallback)"""
@@ -167,53 +218,272 @@ class EnhancedLinkedInSourcingAgent:
             "industry": ""
         }
 
-    def search_linkedin(self, job_description, use_ai_analysis=True, num_results=10):
-        """Search for LinkedIn profiles with optional AI analysis and custom result count (supports pagination)"""
+    def enrich_candidates(self, candidates, job_description, use_ai_analysis=True, ai_limit=None, deadline=None):
+        """Enrich candidates in place; AI analyses run concurrently under the concurrency cap and rate limiter.
+
+        Profiles with a fresh enrichment in the profile store reuse it, so only new or
+        stale profiles cost an analysis. Analyses still running after deadline seconds are
+        abandoned and those candidates get the basic analysis.
+        """
+        if not use_ai_analysis or not self.use_groq:
+            ai_count = 0
+        else:
+            ai_count = len(candidates) if ai_limit is None else min(ai_limit, len(candidates))
+
+        store = self.profile_store
+        stored = store.get_many([c["linkedin_url"] for c in candidates]) if store else {}
+        pending_ai = []
+        for i, candidate in enumerate(candidates):
+            record = stored.get(normalize_linkedin_url(candidate["linkedin_url"]))
+            if store and store.is_fresh(record, require_ai=i < ai_count):
+                candidate.update(record["enrichment"])
+            elif i < ai_count:
+                pending_ai.append(candidate)
+            else:
+                analysis = self._analyze_candidate_basic(candidate)
+                candidate.update(analysis)
+                if store and (record is None or record["enrichment_source"] != "ai"):
+                    store.upsert_profiles([candidate])
+                    store.save_enrichment(candidate["linkedin_url"], analysis, "basic")
+
+        if pending_ai:
+            with span("ai_enrichment"):
+                finished = set()
+                if deadline is None or deadline > 0:
+                    analyses = iter_concurrently(
+                        lambda c: self._analyze_candidate_ai(c, job_description),
+                        pending_ai,
+                        max_workers=self.max_concurrency,
+                        deadline=deadline
+                    )
+                    for index, analysis in analyses:
+                        finished.add(index)
+                        candidate = pending_ai[index]
+                        if analysis is None:
+                            candidate.update(self._analyze_candidate_basic(candidate))
+                            continue
+                        candidate.update(analysis)
+                        if store:
+                            store.upsert_profiles([candidate])
+                            store.save_enrichment(candidate["linkedin_url"], analysis, "ai")
+                for index, candidate in enumerate(pending_ai):
+                    if index not in finished:
+                        record_degraded("enrichment", "deadline", candidate.get("linkedin_url"))
+                        candidate.update(self._analyze_candidate_basic(candidate))
+
+        if store:
+            store.upsert_profiles(candidates)
+        if self.profile_index is not None:
+            self.profile_index.add_many(candidates)
+        if self.embedding_index is not None:
+            self.embedding_index.add_candidates(candidates)
+        return candidates
+
+    def _fetch_page(self, query, start, num):
+        """Fetch one page of Custom Search results, retried and rate limited by the CSE guard"""
+        with span("cse_page"):
+            return self.cse_guard.call(self._fetch_page_once, query, start, num)
+
+    def _fetch_page_once(self, query, start, num):
+        """One Custom Search request over a pooled keep-alive connection"""
+        with get_client_registry().cse_http() as http:
+            results = self.service.cse().list(
+                q=query,
+                cx=self.search_engine_id,
+                num=num,
+                start=start
+            ).execute(http=http)
+        return results.get('items', [])
+
+    def _collect_candidates(self, items, candidates, seen_urls, num_results):
+        """Filter CSE items into candidate dicts in rank order, skipping duplicate profiles"""
+        for item in items:
+            linkedin_url = item['link']
+            headline = item.get('snippet', '').lower()
+            if not any(kw in headline for kw in ['ml', 'machine learning', 'ai', 'llm', 'research', 'engineer', 'developer']):
+                continue
+            url_key = normalize_linkedin_url(linkedin_url)
+            if url_key in seen_urls:
+                continue
+            seen_urls.add(url_key)
+            name = self._extract_name_from_url(linkedin_url)
+            candidates.append({
+                "name": name,
+                "linkedin_url": linkedin_url,
+                "headline": item.get('snippet', 'No headline available'),
+                "title": item.get('title', 'No title available')
+            })
+            if len(candidates) >= num_results:
+                break
+
+    def _iter_pages_sequential(self, query, num_results, end=None, exclude=()):
+        """Fetch CSE pages one after another, yielding each page's new candidates; stops once enough are found
+        (or, past end, without requesting another page). Profiles in exclude (URLs) are skipped."""
+        candidates, seen_urls = [], {normalize_linkedin_url(url) for url in exclude}
+        start = 1
+        while len(candidates) < num_results and start <= CSE_MAX_START:
+            if end is not None and time.monotonic() >= end:
+                record_degraded("search", "deadline")
+                break
+            num = min(CSE_PAGE_SIZE, num_results - len(candidates))
+            items = self._fetch_page(query, start, num)
+            found = len(candidates)
+            self._collect_candidates(items, candidates, seen_urls, num_results)
+            yield candidates[found:]
+            if len(items) < num:
+                break  # No more results
+            start += CSE_PAGE_SIZE
+
+    def _iter_pages_parallel(self, query, num_results, end=None, exclude=()):
+        """Fetch the pages needed for num_results concurrently, yielding each page's new candidates in rank order.
+
+        Pages beyond the first wave are only requested (one at a time) when filtering
+        left us short, so pages that are never needed are never fetched. Past end (a
+        time.monotonic() value) no more pages are waited for. Profiles in exclude (URLs) are skipped.
+        """
+        candidates, seen_urls = [], {normalize_linkedin_url(url) for url in exclude}
+        starts = list(range(1, CSE_MAX_START + 1, CSE_PAGE_SIZE))
+        first_wave = starts[:max(1, -(-num_results // CSE_PAGE_SIZE))]
+        exhausted = False
+        executor = ThreadPoolExecutor(max_workers=len(first_wave))
+        try:
+            pending = [
+                executor.submit(contextvars.copy_context().run, self._fetch_page, query, start, CSE_PAGE_SIZE)
+                for start in first_wave
+            ]
+            for future in pending:
+                try:
+                    items = future.result(timeout=None if end is None else max(0.0, end - time.monotonic()))
+                except FutureTimeoutError:
+                    record_degraded("search", "deadline")
+                    return
+                found = len(candidates)
+                self._collect_candidates(items, candidates, seen_urls, num_results)
+                yield candidates[found:]
+                if len(candidates) >= num_results or len(items) < CSE_PAGE_SIZE:
+                    exhausted = len(items) < CSE_PAGE_SIZE
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for start in starts[len(first_wave):]:
+            if exhausted or len(candidates) >= num_results:
+                break
+            if end is not None and time.monotonic() >= end:
+                record_degraded("search", "deadline")
+                break
+            items = self._fetch_page(query, start, CSE_PAGE_SIZE)
+            found = len(candidates)
+            self._collect_candidates(items, candidates, seen_urls, num_results)
+            yield candidates[found:]
+            exhausted = len(items) < CSE_PAGE_SIZE
+
+    def _iter_pages(self, job_description, num_results, parallel_pages, budget=None, exclude=()):
+        with span("query_extraction"):
+            timeout = budget.for_stage("query_extraction") if budget else None
+            search_terms = call_with_timeout(self.extract_search_terms_with_ai, timeout, job_description)
+            if search_terms is None:
+                record_degraded("search_terms", "deadline")
+                search_terms = self._extract_search_terms_basic(job_description)
+        query = f"site:linkedin.com/in/ {search_terms}"
+        end = time.monotonic() + budget.for_stage("search") if budget else None
+        if parallel_pages is None:
+            parallel_pages = self.parallel_pages
+        if parallel_pages:
+            return self._iter_pages_parallel(query, num_results, end, exclude)
+        return self._iter_pages_sequential(query, num_results, end, exclude)
+
+    def search_local(self, job_description, num_results=10, match="any"):
+        """Stored profiles that best match the job description (BM25 over the local index), enrichment included.
+
+        The query is the description's basic search terms and skill tokens (job_terms), not its raw text.
+        """
+        if self.profile_index is None or num_results <= 0:
+            return []
+        with span("local_search"):
+            hits = self.profile_index.search(job_terms(job_description), limit=num_results, match=match,
+                                             min_score=LOCAL_SEARCH_MIN_SCORE, min_match=LOCAL_SEARCH_MIN_MATCH)
+        return [candidate for _, candidate in hits]
+
+    def search_semantic(self, job_description, num_results=100, nprobe=None):
+        """Stored profiles nearest to the job description in embedding space (approximate, best first)"""
+        if self.embedding_index is None or num_results <= 0:
+            return []
+        with span("semantic_retrieval"):
+            hits = self.embedding_index.search(job_description, k=num_results, nprobe=nprobe)
+            return self.profile_index.get_many(key for key, _ in hits)
+
+    def search_linkedin(self, job_description, use_ai_analysis=True, num_results=10, ai_limit=None, parallel_pages=None,
+                        budget=None, local_first=None):
+        """Search for LinkedIn profiles with optional AI analysis and custom result count (supports pagination).
+
+        With a Budget, query extraction, page fetching and enrichment each stop at their share
+        of it and fall back (basic terms, fewer pages, basic analysis). Local-first searches
+        (default SEARCH_LOCAL_FIRST) start from the best matches in the local profile index
+        and only ask CSE for the profiles still missing.
+        """
+        local = self.search_local(job_description, num_results) if self._local_first(local_first) else []
+        if len(local) >= num_results:
+            return local
         if self.use_static:
+            if local:
+                return local
+            record_degraded("search", "not_configured")
             return self._static_data()
         
         try:
-            search_terms = self.extract_search_terms_with_ai(job_description)
-            query = f"site:linkedin.com/in/ {search_terms}"
             candidates = []
-            start = 1
-            per_page = 10
-            while len(candidates) < num_results and start <= 30:
-                results = self.service.cse().list(
-                    q=query,
-                    cx=self.search_engine_id,
-                    num=min(per_page, num_results - len(candidates)),
-                    start=start
-                ).execute()
-                items = results.get('items', [])
-                for item in items:
-                    linkedin_url = item['link']
-                    headline = item.get('snippet', '').lower()
-                    if not any(kw in headline for kw in ['ml', 'machine learning', 'ai', 'llm', 'research', 'engineer', 'developer']):
-                        continue
-                    name = self._extract_name_from_url(linkedin_url)
-                    candidate_data = {
-                        "name": name,
-                        "linkedin_url": linkedin_url,
-                        "headline": item.get('snippet', 'No headline available'),
-                        "title": item.get('title', 'No title available')
-                    }
-                    if use_ai_analysis and len(candidates) < 3:
-                        analysis = self.analyze_candidate_with_ai(candidate_data, job_description)
-                        candidate_data.update(analysis)
-                    else:
-                        candidate_data.update(self._analyze_candidate_basic(candidate_data))
-                    candidates.append(candidate_data)
-                    time.sleep(0.05)
-                    if len(candidates) >= num_results:
-                        break
-                if len(items) < per_page:
-                    break  # No more results
-                start += per_page
-            return candidates if candidates else self._static_data()
+            exclude = [c["linkedin_url"] for c in local]
+            for page in self._iter_pages(job_description, num_results - len(local), parallel_pages, budget, exclude):
+                candidates.extend(page)
+            deadline = budget.for_stage("enrichment") if budget else None
+            self.enrich_candidates(candidates, job_description, use_ai_analysis, ai_limit, deadline)
+            if local or candidates:
+                return local + candidates
+            record_degraded("search", "no_results")
+            return self._static_data()
         except Exception as e:
             print(f"Error searching LinkedIn: {e}")
-            return self._static_data()
+            record_degraded("search", describe_failure(e))
+            return local or self._static_data()
+
+    def iter_search_linkedin(self, job_description, use_ai_analysis=True, num_results=10, ai_limit=None, parallel_pages=None,
+                             local_first=None):
+        """Like search_linkedin, but yields each CSE page's enriched candidates as soon as the page arrives
+        (local-first searches yield the local matches first)"""
+        local = self.search_local(job_description, num_results) if self._local_first(local_first) else []
+        if local:
+            yield local
+        if len(local) >= num_results:
+            return
+        if self.use_static:
+            if not local:
+                record_degraded("search", "not_configured")
+                yield self._static_data()
+            return
+        
+        found = 0
+        try:
+            exclude = [c["linkedin_url"] for c in local]
+            for page in self._iter_pages(job_description, num_results - len(local), parallel_pages, exclude=exclude):
+                if not page:
+                    continue
+                # ai_limit counts candidates across the whole search, not per page
+                page_ai_limit = None if ai_limit is None else max(0, ai_limit - found)
+                self.enrich_candidates(page, job_description, use_ai_analysis, page_ai_limit)
+                found += len(page)
+                yield page
+        except Exception as e:
+            print(f"Error searching LinkedIn: {e}")
+            record_degraded("search", describe_failure(e))
+        else:
+            if not found and not local:
+                record_degraded("search", "no_results")
+        if not found and not local:
+            yield self._static_data()
+
+    def _local_first(self, local_first):
+        return (self.local_first if local_first is None else local_first) and self.profile_index is not None
 
     def _extract_name_from_url(self, linkedin_url):
         """Extract name from LinkedIn URL"""
@@ -0,0 +1,107 @@
+"""Regression test: the vectorized and matcher-based scoring paths rank exactly like per-candidate basic scoring.
+
+    cd backend
+    python -m pytest -q tests
+"""
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.enhanced_scoring import (
+    OptimizedScoring, KEYWORD_MATCHER, SKILL_PATTERN, LOCATION_KEYWORDS, ELITE_SCHOOLS, STRONG_SCHOOLS,
+    TOP_TECH_COMPANIES, SENIOR_ROLES, JUNIOR_ROLES, TECH_SKILLS, get_job_profile, score_candidates_fast
+)
+from app.core.batch_scoring import score_candidates_batch, score_jobs_batch
+
+JOB_DESCRIPTIONS = [
+    "Senior ML Engineer with Python, PyTorch and LLM experience in Mountain View",
+    "Backend engineer: Java, Node.js, Kubernetes, SQL; remote friendly",
+    "Staff C++ / Rust systems developer, low latency trading, New York",
+    "Frontend React + TypeScript developer (JavaScript, GraphQL, CI/CD) for a fintech startup"
+]
+
+# Dictionary entries mixed with near misses ("javascript" contains "java", "uwsgi" contains "uw")
+_WORDS = sorted(
+    ELITE_SCHOOLS | STRONG_SCHOOLS | TOP_TECH_COMPANIES | SENIOR_ROLES | JUNIOR_ROLES | TECH_SKILLS | set(LOCATION_KEYWORDS)
+) + ["engineer", "developer", "university", "months", "job hopping", "c++", "c#", "rust", "llm", "uwsgi",
+     "javascript", "node.js", "3 years", "1 yr", "since 2022", "2019", "acme", "freelance", "berlin"]
+
+
+def _text(rng, count):
+    return " ".join(rng.choice(_WORDS) for _ in range(count)).title() if rng.random() < 0.5 else \
+        " | ".join(rng.choice(_WORDS) for _ in range(count))
+
+
+def _candidates(count, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Candidate {i}",
+            "linkedin_url": f"https://www.linkedin.com/in/candidate-{seed}-{i}",
+            "headline": _text(rng, rng.randint(0, 8)),
+            "title": _text(rng, rng.randint(0, 3)),
+            "education": [_text(rng, 2) for _ in range(rng.randint(0, 2))],
+            "companies": [_text(rng, 1) for _ in range(rng.randint(0, 3))],
+            "skills": [rng.choice(_WORDS) for _ in range(rng.randint(0, 6))],
+            "location": _text(rng, rng.randint(0, 2)),
+            "experience_years": rng.randint(0, 15)
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def candidates():
+    return _candidates(3000, seed=7)
+
+
+def _reference(candidates, job_description):
+    """Per-candidate basic scores, best first, ties in input order"""
+    scorer = OptimizedScoring()
+    ranked = [scorer.score_candidate_entry(c, job_description) for c in candidates]
+    ranked.sort(key=lambda entry: entry["score"], reverse=True)
+    return [(e["linkedin_url"], e["score"], e["breakdown"]) for e in ranked]
+
+
+def _ranking(entries):
+    return [(e["linkedin_url"], e["score"], e["breakdown"]) for e in entries]
+
+
+@pytest.mark.parametrize("job_description", JOB_DESCRIPTIONS)
+def test_batch_scoring_matches_basic(candidates, job_description):
+    expected = _reference(candidates, job_description)
+    assert _ranking(score_candidates_fast(candidates, job_description)) == expected
+    assert _ranking(score_candidates_batch(candidates, job_description, top_k=25)) == expected[:25]
+
+
+def test_multi_job_scoring_matches_basic(candidates):
+    rankings = score_jobs_batch(candidates, JOB_DESCRIPTIONS, top_k=50)
+    for job_description, ranked in zip(JOB_DESCRIPTIONS, rankings):
+        assert _ranking(ranked) == _reference(candidates, job_description)[:50]
+
+
+def test_keyword_matcher_matches_substring_search(candidates):
+    for candidate in candidates[:500]:
+        text = candidate["headline"].lower()
+        hits = KEYWORD_MATCHER.scan(text)
+        assert ("elite_school" in hits) == any(kw in text for kw in ELITE_SCHOOLS)
+        assert ("top_company" in hits) == any(kw in text for kw in TOP_TECH_COMPANIES)
+        assert ("senior_role" in hits) == any(kw in text for kw in SENIOR_ROLES)
+        first_location = next((rank for rank, kw in enumerate(LOCATION_KEYWORDS) if kw in text), None)
+        assert hits.get("location") == first_location
+
+
+@pytest.mark.parametrize("job_description", JOB_DESCRIPTIONS)
+def test_skill_matches_match_substring_search(candidates, job_description):
+    job_profile = get_job_profile(job_description)
+    required_skills = set(SKILL_PATTERN.findall(job_description.lower()))
+    for candidate in candidates[:500]:
+        headline, title = candidate["headline"].lower(), candidate["title"].lower()
+        skills = [s.lower() for s in candidate["skills"]]
+        expected = sum(1 for skill in required_skills
+                       if skill in headline or skill in title or any(skill in s for s in skills))
+        assert job_profile.count_skill_matches(candidate) == expected